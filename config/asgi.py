@@ -9,8 +9,14 @@ https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
+# Флаг ставится после загрузки настроек: load_dotenv(override=True) в них
+# перетёр бы переменную окружения пустым ASYNC_AUTH_VIEWS= из .env.
+if settings.ASYNC_AUTH_VIEWS is None:
+    settings.ASYNC_AUTH_VIEWS = True
+
 application = get_asgi_application()
@@ -0,0 +1,66 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundPool:
+    """Локальный пул фоновых задач, выполняемых вне цикла запрос-ответ."""
+
+    def __init__(self, max_workers, eager=False):
+        self.max_workers = max_workers
+        # eager: задачи выполняются сразу в вызывающем потоке (для замеров и отладки).
+        self.eager = eager
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        # Создаём лениво, чтобы потоки не появлялись в процессе до fork().
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="background"
+                    )
+        return self._executor
+
+    def submit(self, func, *args, **kwargs):
+        if self.eager:
+            future = Future()
+            try:
+                # Без close_old_connections(): соединения принадлежат вызывающему коду.
+                future.set_result(func(*args, **kwargs))
+            except Exception as exc:
+                future.set_exception(exc)
+            return future
+        return self.executor.submit(self._call, func, args, kwargs)
+
+    def shutdown(self, timeout=None):
+        """
+        Ждёт завершения поставленных задач не дольше timeout секунд (перед
+        выходом процесса). Возвращает False, если задачи не успели.
+        """
+        if self._executor is None:
+            return True
+        # У ThreadPoolExecutor.shutdown(wait=True) нет таймаута: ждём его в отдельном потоке.
+        waiter = threading.Thread(target=self._executor.shutdown, daemon=True)
+        waiter.start()
+        waiter.join(timeout)
+        return not waiter.is_alive()
+
+    def _call(self, func, args, kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            logger.exception("Фоновая задача %s завершилась с ошибкой", func.__qualname__)
+            raise
+        finally:
+            close_old_connections()
+
+
+background_pool = BackgroundPool(max_workers=settings.BACKGROUND_WORKERS)
@@ -0,0 +1,130 @@
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def accepted_encodings(header):
+    """Кодировки из Accept-Encoding с ненулевым q."""
+    encodings = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            encodings.add(name.strip().lower())
+    return encodings
+
+
+class Compressor:
+    """Потоковый компрессор с общим интерфейсом для gzip (zlib) и brotli."""
+
+    def __init__(self, encoding, options):
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=options["BROTLI_QUALITY"])
+            self.compress = self._compressor.process
+            self.flush = self._compressor.flush
+            self.finish = self._compressor.finish
+        else:
+            # wbits=31: формат gzip; время в заголовке нулевое, результат детерминирован.
+            self._compressor = zlib.compressobj(options["GZIP_LEVEL"], zlib.DEFLATED, 31)
+            self.compress = self._compressor.compress
+            self.flush = lambda: self._compressor.flush(zlib.Z_SYNC_FLUSH)
+            self.finish = self._compressor.flush
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы с текстовыми типами из COMPRESSION["CONTENT_TYPES"]:
+    brotli, если клиент его принимает и пакет установлен, иначе gzip.
+    Обычные ответы меньше MIN_SIZE отдаются как есть; потоковые (выгрузки)
+    сжимаются по частям, каждая часть сразу уходит клиенту.
+
+    В асинхронной цепочке тело сжимается прямо в event loop, как в
+    GZipMiddleware Django: ответы API небольшие, а переход в поток стоил бы
+    дороже самого сжатия.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = settings.COMPRESSION
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        content_type = response.get("Content-Type", "").split(";")[0].strip()
+        if response.has_header("Content-Encoding") or not content_type.startswith(
+            self.options["CONTENT_TYPES"]
+        ):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if not response.streaming and len(response.content) < self.options["MIN_SIZE"]:
+            return response
+
+        encodings = accepted_encodings(request.headers.get("Accept-Encoding", ""))
+        if brotli is not None and "br" in encodings:
+            encoding = "br"
+        elif "gzip" in encodings:
+            encoding = "gzip"
+        else:
+            return response
+
+        compressor = Compressor(encoding, self.options)
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = self.acompress_stream(compressor, response.streaming_content)
+            else:
+                response.streaming_content = self.compress_stream(compressor, response.streaming_content)
+            del response["Content-Length"]
+        else:
+            compressed = compressor.compress(response.content) + compressor.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response["Content-Length"] = str(len(compressed))
+
+        # Сжатое тело отличается от исходного побайтно: ETag становится слабым.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        response["Content-Encoding"] = encoding
+        return response
+
+    @staticmethod
+    def compress_stream(compressor, chunks):
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+    @staticmethod
+    async def acompress_stream(compressor, chunks):
+        async for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
@@ -0,0 +1,223 @@
+import contextvars
+import hashlib
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, OperationalError, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+_use_primary = contextvars.ContextVar("use_primary", default=False)
+_used_replicas = contextvars.ContextVar("used_replicas", default=None)
+
+
+@contextmanager
+def use_primary():
+    """Направляет все чтения внутри блока в основную БД."""
+    token = _use_primary.set(True)
+    try:
+        yield
+    finally:
+        _use_primary.reset(token)
+
+
+def used_replicas():
+    """Реплики, с которых уже читал текущий запрос."""
+    return frozenset(_used_replicas.get() or ())
+
+
+class ReplicaPool:
+    """
+    Реплики из DATABASES (все алиасы с TEST.MIRROR = default) по кругу.
+    Доступность проверяется не чаще HEALTH_CHECK_INTERVAL; упавшая реплика
+    исключается на RETRY_AFTER секунд, чтения в это время идут на остальные
+    реплики или на основную БД.
+    """
+
+    def __init__(self, aliases, health_check_interval, retry_after):
+        self.aliases = list(aliases)
+        self.health_check_interval = health_check_interval
+        self.retry_after = retry_after
+        self._cycle = itertools.cycle(self.aliases)
+        self._checked_at = {}
+        self._down_until = {}
+        self._lock = threading.Lock()
+
+    def choose(self):
+        now = time.monotonic()
+        for _ in range(len(self.aliases)):
+            with self._lock:
+                alias = next(self._cycle)
+            if self._down_until.get(alias, 0) > now:
+                continue
+            if now - self._checked_at.get(alias, float("-inf")) >= self.health_check_interval:
+                if not self.check(alias):
+                    continue
+            return alias
+        return None
+
+    def check(self, alias):
+        connection = connections[alias]
+        try:
+            connection.ensure_connection()
+            healthy = connection.is_usable()
+        except DatabaseError:
+            healthy = False
+        self._checked_at[alias] = time.monotonic()
+        if healthy:
+            self._down_until.pop(alias, None)
+            return True
+        self.mark_down(alias)
+        return False
+
+    def mark_down(self, alias):
+        logger.warning("Реплика %s недоступна, чтения идут мимо неё %.0f с", alias, self.retry_after)
+        self._down_until[alias] = time.monotonic() + self.retry_after
+        connections[alias].close()
+
+    def status(self):
+        now = time.monotonic()
+        return {alias: self._down_until.get(alias, 0) <= now for alias in self.aliases}
+
+
+def _replica_aliases():
+    return [
+        alias
+        for alias, config in settings.DATABASES.items()
+        if alias != DEFAULT_DB_ALIAS and config.get("TEST", {}).get("MIRROR") == DEFAULT_DB_ALIAS
+    ]
+
+
+replica_pool = ReplicaPool(
+    _replica_aliases(),
+    settings.REPLICA_ROUTING["HEALTH_CHECK_INTERVAL"],
+    settings.REPLICA_ROUTING["RETRY_AFTER"],
+)
+
+
+class ReplicaRouter:
+    """
+    Запись — в основную БД, чтение — на реплики, кроме запросов с недавней
+    записью от того же клиента (см. ReplicaRoutingMiddleware) и чтений внутри
+    открытой транзакции основной БД.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_pool.aliases or _use_primary.get():
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        alias = replica_pool.choose()
+        if alias is None:
+            return DEFAULT_DB_ALIAS
+        used = _used_replicas.get()
+        if used is not None:
+            used.add(alias)
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in replica_pool.aliases
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Небезопасные запросы целиком работают с основной БД и помечают клиента
+    (по токену или сессии) в общем кэше на STICKY_SECONDS: пока метка жива,
+    его чтения тоже идут в основную БД и видят собственные записи.
+
+    В асинхронной цепочке метка читается и пишется через aget_many/aset_many,
+    а контекстные переменные доходят до потоков sync_to_async, где выполняются
+    запросы к БД.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = settings.REPLICA_ROUTING["STICKY_SECONDS"]
+        self.cache = caches[settings.REPLICA_ROUTING["CACHE_ALIAS"]]
+        # Метку ставит один воркер, а читает любой другой: кэш процесса не подходит.
+        if replica_pool.aliases and isinstance(self.cache, (LocMemCache, DummyCache)):
+            raise ImproperlyConfigured(
+                f"С репликами кэш {settings.REPLICA_ROUTING['CACHE_ALIAS']!r} должен быть общим "
+                "для воркеров (CATALOGUE_CACHE_BACKEND), а не LocMemCache/DummyCache"
+            )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_pool.aliases:
+            return self.get_response(request)
+
+        keys = self.sticky_keys(request)
+        unsafe = request.method not in SAFE_METHODS
+        primary = _use_primary.set(unsafe or bool(self.cache.get_many(keys)))
+        used = _used_replicas.set(set())
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_primary.reset(primary)
+            _used_replicas.reset(used)
+        if unsafe:
+            self.cache.set_many(dict.fromkeys(keys, 1), self.sticky_seconds)
+        return response
+
+    async def __acall__(self, request):
+        if not replica_pool.aliases:
+            return await self.get_response(request)
+
+        keys = self.sticky_keys(request)
+        unsafe = request.method not in SAFE_METHODS
+        primary = _use_primary.set(unsafe or bool(await self.cache.aget_many(keys)))
+        used = _used_replicas.set(set())
+        try:
+            response = await self.get_response(request)
+        finally:
+            _use_primary.reset(primary)
+            _used_replicas.reset(used)
+        if unsafe:
+            await self.cache.aset_many(dict.fromkeys(keys, 1), self.sticky_seconds)
+        return response
+
+    def process_exception(self, request, exception):
+        """Реплика, на которой упал запрос, сразу исключается из ротации."""
+        if isinstance(exception, OperationalError):
+            for alias in _used_replicas.get() or ():
+                connection = connections[alias]
+                if connection.connection is None or not connection.is_usable():
+                    replica_pool.mark_down(alias)
+        return None
+
+    @staticmethod
+    def sticky_keys(request):
+        """
+        Клиент помечается по токену и сессии. IP не используется: за одним
+        NAT или прокси все клиенты получили бы метку и ушли бы в основную БД.
+        """
+        identities = [
+            request.headers.get("Authorization"),
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME),
+        ]
+        return [
+            f"db:sticky:{hashlib.md5(identity.encode()).hexdigest()}" for identity in identities if identity
+        ]
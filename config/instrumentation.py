@@ -0,0 +1,239 @@
+import bisect
+import contextvars
+import heapq
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework import serializers
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+_current_timing = contextvars.ContextVar("request_timing", default=None)
+
+
+class RequestTiming:
+    """Счётчики одного запроса: SQL (число, время, самые медленные) и именованные отрезки."""
+
+    def __init__(self, slow_queries_kept):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.spans = {}
+        self.slow_queries = []
+        self.slow_queries_kept = slow_queries_kept
+
+    def add_query(self, sql, elapsed):
+        self.queries += 1
+        self.sql_time += elapsed
+        entry = (elapsed, self.queries, sql)
+        if len(self.slow_queries) < self.slow_queries_kept:
+            heapq.heappush(self.slow_queries, entry)
+        elif elapsed > self.slow_queries[0][0]:
+            heapq.heapreplace(self.slow_queries, entry)
+
+    def add_span(self, name, elapsed):
+        self.spans[name] = self.spans.get(name, 0.0) + elapsed
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Обёртка выполнения SQL, постоянно стоящая на каждом соединении. Запрос
+    учитывается в RequestTiming из контекстной переменной, поэтому попадает в
+    счётчики и из потока sync_to_async, где у асинхронного запроса свои
+    соединения: contextvars копируются в поток, а сами соединения — нет.
+    """
+    timing = _current_timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+@contextmanager
+def timed(name):
+    """Добавляет длительность блока к отрезку name текущего запроса (если он измеряется)."""
+    timing = _current_timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add_span(name, time.perf_counter() - started)
+
+
+class TimedListSerializer(serializers.ListSerializer):
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimedSerializerMixin:
+    """Учитывает построение serializer.data в отрезке serialize для Server-Timing."""
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class RouteHistogram:
+    """
+    Скользящая гистограмма длительностей по маршрутам: по одному слоту
+    счётчиков на минуту, хранятся только последние window_minutes слотов.
+    """
+
+    def __init__(self, buckets_ms, window_minutes):
+        self.buckets_ms = list(buckets_ms)
+        self.window_minutes = window_minutes
+        self._routes = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, duration_ms):
+        minute = int(time.time() // 60)
+        bucket = bisect.bisect_left(self.buckets_ms, duration_ms)
+        with self._lock:
+            slots = self._routes.setdefault(route, [])
+            if not slots or slots[-1][0] != minute:
+                slots.append([minute, [0] * (len(self.buckets_ms) + 1), 0, 0.0])
+                while slots[0][0] <= minute - self.window_minutes:
+                    slots.pop(0)
+            slot = slots[-1]
+            slot[1][bucket] += 1
+            slot[2] += 1
+            slot[3] += duration_ms
+
+    def snapshot(self):
+        oldest = int(time.time() // 60) - self.window_minutes
+        labels = [f"le_{bound}" for bound in self.buckets_ms] + ["inf"]
+        result = {}
+        with self._lock:
+            for route, slots in self._routes.items():
+                counts = [0] * len(labels)
+                count, total = 0, 0.0
+                for minute, slot_counts, slot_count, slot_total in slots:
+                    if minute <= oldest:
+                        continue
+                    counts = [a + b for a, b in zip(counts, slot_counts)]
+                    count += slot_count
+                    total += slot_total
+                if count:
+                    result[route] = {
+                        "count": count,
+                        "mean_ms": round(total / count, 3),
+                        "buckets": dict(zip(labels, counts)),
+                    }
+        return {"window_minutes": self.window_minutes, "routes": result}
+
+
+route_histogram = RouteHistogram(
+    buckets_ms=settings.SERVER_TIMING["HISTOGRAM_BUCKETS_MS"],
+    window_minutes=settings.SERVER_TIMING["HISTOGRAM_WINDOW_MINUTES"],
+)
+
+
+class ServerTimingMiddleware:
+    """
+    Считает SQL-запросы и их время, время сериализации и представления,
+    отдаёт их в заголовке Server-Timing, пишет в лог медленные запросы
+    и пополняет гистограмму по маршрутам. Работает и в синхронной, и в
+    асинхронной цепочке middleware, не добавляя переходов sync/async.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_request_ms = settings.SERVER_TIMING["SLOW_REQUEST_MS"]
+        self.slow_queries_logged = settings.SERVER_TIMING["SLOW_QUERIES_LOGGED"]
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        # Соединения, открытые до загрузки middleware, сигнала connection_created уже не дадут.
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timing = RequestTiming(self.slow_queries_logged)
+        token = _current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing, started)
+
+    async def __acall__(self, request):
+        timing = RequestTiming(self.slow_queries_logged)
+        token = _current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timing.reset(token)
+        return self.finish(request, response, timing, started)
+
+    def finish(self, request, response, timing, started):
+        total_ms = (time.perf_counter() - started) * 1000
+
+        sql_ms = timing.sql_time * 1000
+        serialize_ms = timing.spans.get("serialize", 0.0) * 1000
+        view_ms = max(total_ms - sql_ms - serialize_ms, 0.0)
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={sql_ms:.2f};desc="{timing.queries} queries"',
+                f"serialize;dur={serialize_ms:.2f}",
+                f"view;dur={view_ms:.2f}",
+                f"total;dur={total_ms:.2f}",
+            ]
+        )
+
+        match = request.resolver_match
+        route = f"{request.method} {match.view_name if match else '<unresolved>'}"
+        route_histogram.observe(route, total_ms)
+
+        if total_ms >= self.slow_request_ms:
+            logger.warning(
+                "Медленный запрос %s %s: %.1f мс, SQL %d шт. за %.1f мс, сериализация %.1f мс%s",
+                request.method,
+                request.get_full_path(),
+                total_ms,
+                timing.queries,
+                sql_ms,
+                serialize_ms,
+                "".join(
+                    f"\n  {elapsed * 1000:.1f} мс: {sql[:500]}"
+                    for elapsed, _, sql in sorted(timing.slow_queries, reverse=True)
+                ),
+            )
+        return response
+
+
+class RouteTimingAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(route_histogram.snapshot())
@@ -0,0 +1,327 @@
+import gc
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.servers.basehttp import WSGIRequestHandler, WSGIServer
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils import translation
+
+from config.background import background_pool
+
+logger = logging.getLogger(__name__)
+
+LISTEN_FD_ENV = "SERVE_LISTEN_FD"
+
+
+def warm_up():
+    """
+    Загружает в родительском процессе всё, что воркеры иначе строили бы
+    каждый сам: маршруты и их регулярные выражения, поля сериализаторов
+    (вместе с кэшами _meta моделей), каталоги переводов и модули, которые
+    вьюхи импортируют лениво ради быстрого холодного старта.
+    """
+    started = time.perf_counter()
+    resolver = get_resolver()
+    serializers = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            pattern.pattern.regex
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+                continue
+            view = getattr(pattern.callback, "cls", None) or getattr(pattern.callback, "view_class", None)
+            serializer_class = getattr(view, "serializer_class", None)
+            if serializer_class is not None and serializer_class not in serializers:
+                serializers.add(serializer_class)
+                serializer_class().fields
+
+    walk(resolver.url_patterns)
+    resolver.reverse_dict
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.deactivate()
+    import courses.importing  # noqa: F401
+
+    # Соединения и клиенты кэшей не должны достаться воркерам общими.
+    connections.close_all()
+    for cache in caches.all(initialized_only=True):
+        cache.close()
+    return {
+        "serializers": len(serializers),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def memory_usage(pid):
+    """RSS, PSS и разделяемая/частная память процесса в КиБ из /proc (только Linux)."""
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            lines = file.readlines()
+    except OSError:
+        return None
+    values = {}
+    for line in lines[1:]:
+        name, _, rest = line.partition(":")
+        values[name] = int(rest.split()[0])
+    return {
+        "rss": values.get("Rss", 0),
+        "pss": values.get("Pss", 0),
+        "shared": values.get("Shared_Clean", 0) + values.get("Shared_Dirty", 0),
+        "private": values.get("Private_Clean", 0) + values.get("Private_Dirty", 0),
+    }
+
+
+def listen_socket(host, port, backlog):
+    """Слушающий сокет; после re-exec (SIGUSR2) берётся унаследованный дескриптор."""
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is not None:
+        sock = socket.socket(fileno=int(fd))
+    else:
+        family = socket.AF_INET6 if ":" in host else socket.AF_INET
+        sock = socket.create_server((host, port), family=family, backlog=backlog)
+    # Таймаут ограничивает ожидание в select()/accept(): воркер, которому не
+    # досталось соединение, и воркер, получивший SIGTERM, не зависают в них.
+    sock.settimeout(1)
+    return sock
+
+
+class WorkerServer(WSGIServer):
+    """
+    WSGIServer на уже открытом общем сокете, считающий принятые соединения.
+
+    Это однопоточный сервер из django.core.servers.basehttp, а не боевой
+    HTTP-сервер: наружу он выставляется только за обратным прокси (nginx),
+    который буферизует запросы и ответы. timeout ограничивает каждую операцию
+    чтения и записи соединения, иначе медленный клиент (slowloris) занял бы
+    воркер навсегда.
+    """
+
+    handled = 0
+
+    def __init__(self, sock, timeout):
+        super().__init__(sock.getsockname()[:2], WSGIRequestHandler, bind_and_activate=False)
+        self.timeout = timeout
+        self.socket.close()
+        self.socket = sock
+        self.server_address = sock.getsockname()
+        self.server_name, self.server_port = self.server_address[:2]
+        self.setup_environ()
+
+    def get_request(self):
+        # Принятый сокет не наследует таймаут слушающего и был бы блокирующим.
+        request, client_address = super().get_request()
+        request.settimeout(self.timeout)
+        return request, client_address
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], TimeoutError):
+            logger.info("Соединение %s:%s закрыто по таймауту", *client_address[:2])
+            return
+        super().handle_error(request, client_address)
+
+    def process_request(self, request, client_address):
+        self.handled += 1
+        super().process_request(request, client_address)
+
+    def server_close(self):
+        # Сокет принадлежит родителю и остальным воркерам.
+        pass
+
+
+class Worker:
+    """Однопоточный WSGI-воркер: обрабатывает max_requests соединений и выходит."""
+
+    def __init__(self, sock, application, max_requests, timeout, graceful_timeout):
+        self.server = WorkerServer(sock, timeout)
+        self.server.set_app(application)
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.running = True
+        self.stopped_at = None
+
+    def stop(self, signum, frame):
+        self.running = False
+        self.stopped_at = time.monotonic()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        for signum in (signal.SIGINT, signal.SIGHUP, signal.SIGUSR2):
+            signal.signal(signum, signal.SIG_IGN)
+        # Флаг остановки проверяется между запросами (не реже раза в секунду
+        # по таймауту сокета), начатый запрос всегда дообрабатывается.
+        while self.running and (not self.max_requests or self.server.handled < self.max_requests):
+            self.server.handle_request()
+        # Фоновые задачи (письма, пересчёты) дорабатывают в пределах времени,
+        # которое родитель ждёт до SIGKILL; os._exit() иначе оборвал бы их.
+        elapsed = time.monotonic() - self.stopped_at if self.stopped_at else 0
+        if not background_pool.shutdown(max(self.graceful_timeout - elapsed, 0)):
+            logger.warning(
+                "Воркер %s: фоновые задачи не завершились за %s с", os.getpid(), self.graceful_timeout
+            )
+        connections.close_all()
+
+
+class PreforkServer:
+    """
+    Родительский процесс: держит сокет и прогретое приложение, запускает
+    воркеры через fork() и следит за ними.
+
+    SIGHUP — поочерёдная замена воркеров без закрытия сокета;
+    SIGUSR2 — перезапуск родителя с новым кодом (execv) с тем же сокетом;
+    SIGTERM/SIGINT — плавная остановка: воркеры дообрабатывают запросы.
+    """
+
+    def __init__(
+        self,
+        sock,
+        application,
+        workers,
+        max_requests=0,
+        max_requests_jitter=0,
+        timeout=30,
+        graceful_timeout=30,
+        stats_interval=60,
+        freeze=True,
+    ):
+        self.sock = sock
+        self.application = application
+        self.workers = workers
+        self.max_requests = max_requests
+        self.max_requests_jitter = max_requests_jitter
+        self.timeout = timeout
+        self.graceful_timeout = graceful_timeout
+        self.stats_interval = stats_interval
+        self.freeze = freeze
+        self.children = {}
+        self.retiring = set()
+        self.signals = []
+
+    def spawn(self):
+        max_requests = self.max_requests
+        if max_requests and self.max_requests_jitter:
+            # Разброс, чтобы воркеры не перезапускались одновременно.
+            max_requests += random.randint(0, self.max_requests_jitter)
+        if self.freeze:
+            # Объекты родителя уходят в постоянное поколение: сборщик мусора
+            # воркера их не обходит и не пишет в их страницы, поэтому память
+            # остаётся общей (copy-on-write) после fork().
+            gc.freeze()
+        pid = os.fork()
+        if pid:
+            self.children[pid] = time.monotonic()
+            return pid
+        gc.enable()
+        status = 0
+        try:
+            Worker(self.sock, self.application, max_requests, self.timeout, self.graceful_timeout).run()
+        except BaseException:
+            logger.exception("Воркер %s завершился с ошибкой", os.getpid())
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(status)
+
+    def run(self):
+        for signum in (signal.SIGHUP, signal.SIGUSR2, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self.signals.append(signum))
+
+        for _ in range(self.workers):
+            self.spawn()
+        logger.info("Запущено %s воркеров на %s:%s", self.workers, *self.sock.getsockname()[:2])
+        self.report()
+
+        reported_at = time.monotonic()
+        while True:
+            self.reap()
+            while self.signals:
+                signum = self.signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self.reload()
+                elif signum == signal.SIGUSR2:
+                    self.stop()
+                    self.reexec()
+                else:
+                    self.stop()
+                    return
+            while len(self.children) - len(self.retiring) < self.workers:
+                self.spawn()
+            if self.stats_interval and time.monotonic() - reported_at >= self.stats_interval:
+                self.report()
+                reported_at = time.monotonic()
+            time.sleep(0.2)
+
+    def reap(self):
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            self.children.pop(pid, None)
+            if pid in self.retiring:
+                self.retiring.discard(pid)
+            elif os.waitstatus_to_exitcode(status):
+                logger.warning(
+                    "Воркер %s упал (код %s), запускаем новый", pid, os.waitstatus_to_exitcode(status)
+                )
+            else:
+                logger.info("Воркер %s обработал max-requests запросов, запускаем новый", pid)
+
+    def reload(self):
+        """Новые воркеры запускаются до остановки старых, сокет не закрывается."""
+        logger.info("SIGHUP: поочерёдная замена воркеров")
+        for pid in [pid for pid in self.children if pid not in self.retiring]:
+            self.spawn()
+            self.retire(pid)
+
+    def retire(self, pid):
+        self.retiring.add(pid)
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def stop(self):
+        for pid in list(self.children):
+            self.retire(pid)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self.children and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in list(self.children):
+            logger.warning("Воркер %s не завершился за %s с, SIGKILL", pid, self.graceful_timeout)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            self.children.pop(pid)
+        self.retiring.clear()
+
+    def reexec(self):
+        logger.info("SIGUSR2: перезапуск с новым кодом, сокет передаётся по наследству")
+        self.sock.set_inheritable(True)
+        os.environ[LISTEN_FD_ENV] = str(self.sock.fileno())
+        os.execv(sys.executable, [sys.executable, *sys.argv])
+
+    def report(self):
+        parent = memory_usage(os.getpid())
+        if parent is None:
+            return
+        rows = [("parent", os.getpid(), parent)]
+        rows += [("worker", pid, memory_usage(pid)) for pid in self.children]
+        for role, pid, usage in rows:
+            if usage is not None:
+                logger.info(
+                    "%s %s: RSS %.1f МиБ, PSS %.1f МиБ, общая %.1f МиБ, частная %.1f МиБ",
+                    role,
+                    pid,
+                    *(usage[key] / 1024 for key in ("rss", "pss", "shared", "private")),
+                )
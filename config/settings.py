@@ -21,6 +21,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    # SearchVectorField и GinIndex для полнотекстового поиска (courses.models).
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "users",
@@ -28,6 +30,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "config.instrumentation.ServerTimingMiddleware",
+    "config.compression.CompressionMiddleware",
+    "config.db_router.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -37,8 +42,68 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+SERVER_TIMING = {
+    # Запросы дольше порога пишутся в лог вместе с самыми медленными SQL.
+    "SLOW_REQUEST_MS": float(os.getenv("SLOW_REQUEST_MS", 500)),
+    "SLOW_QUERIES_LOGGED": 5,
+    "HISTOGRAM_BUCKETS_MS": [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000],
+    "HISTOGRAM_WINDOW_MINUTES": 15,
+}
+
+COMPRESSION = {
+    # Ответы меньше порога не сжимаются: выигрыш в байтах меньше затрат на сжатие.
+    "MIN_SIZE": int(os.getenv("COMPRESSION_MIN_SIZE", 1024)),
+    "GZIP_LEVEL": int(os.getenv("COMPRESSION_GZIP_LEVEL", 6)),
+    # brotli используется, если установлен пакет brotli и клиент его принимает.
+    "BROTLI_QUALITY": int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4)),
+    "CONTENT_TYPES": ("application/json", "application/x-ndjson", "text/"),
+}
+
 ROOT_URLCONF = "config.urls"
 
+# Профиль развёртывания: full — API и админка вместе; api — только маршруты
+# courses/ и users/ без сессий, CSRF, сообщений и админки (клиенты ходят с
+# токеном); admin — только админка. Миграции запускаются в профиле full.
+DJANGO_PROFILE = os.getenv("DJANGO_PROFILE", "full")
+
+if DJANGO_PROFILE == "api":
+    INSTALLED_APPS = [
+        app
+        for app in INSTALLED_APPS
+        if app
+        not in (
+            "django.contrib.admin",
+            "django.contrib.sessions",
+            "django.contrib.messages",
+            "django.contrib.staticfiles",
+        )
+    ]
+    MIDDLEWARE = [
+        middleware
+        for middleware in MIDDLEWARE
+        if middleware
+        not in (
+            "django.contrib.sessions.middleware.SessionMiddleware",
+            "django.middleware.csrf.CsrfViewMiddleware",
+            "django.contrib.auth.middleware.AuthenticationMiddleware",
+            "django.contrib.messages.middleware.MessageMiddleware",
+            "django.middleware.clickjacking.XFrameOptionsMiddleware",
+        )
+    ]
+    ROOT_URLCONF = "config.urls_api"
+elif DJANGO_PROFILE == "admin":
+    ROOT_URLCONF = "config.urls_admin"
+
+# Ленивый запуск: модули admin.py приложений и URL админки импортируются при
+# первом обращении к админке, а не при старте воркера (см. startup_profile).
+LAZY_STARTUP = os.getenv("DJANGO_LAZY_STARTUP") == "1"
+
+if LAZY_STARTUP:
+    INSTALLED_APPS = [
+        "django.contrib.admin.apps.SimpleAdminConfig" if app == "django.contrib.admin" else app
+        for app in INSTALLED_APPS
+    ]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -65,9 +130,67 @@ DATABASES = {
         "PASSWORD": os.getenv("PASSWORD"),
         "HOST": os.getenv("HOST"),
         "PORT": os.getenv("PORT"),
+        # Постоянные соединения с проверкой перед повторным использованием.
+        # Пул соединений (DATABASE_POOL=1) требует psycopg 3 и несовместим с CONN_MAX_AGE.
+        "CONN_MAX_AGE": 0 if os.getenv("DATABASE_POOL") == "1" else int(os.getenv("CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {"pool": True} if os.getenv("DATABASE_POOL") == "1" else {},
     }
 }
 
+# Реплики для чтения: DATABASE_REPLICAS=host1:5432,host2:5432 (имя БД и учётные данные как у основной).
+for number, address in enumerate(filter(None, os.getenv("DATABASE_REPLICAS", "").split(",")), start=1):
+    replica_host, _, replica_port = address.strip().partition(":")
+    DATABASES[f"replica{number}"] = {
+        **DATABASES["default"],
+        "HOST": replica_host,
+        "PORT": replica_port or DATABASES["default"]["PORT"],
+        "OPTIONS": {**DATABASES["default"]["OPTIONS"], "connect_timeout": int(os.getenv("REPLICA_CONNECT_TIMEOUT", 2))},
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["config.db_router.ReplicaRouter"]
+
+REPLICA_ROUTING = {
+    # Сколько секунд после записи клиент читает с основной БД.
+    "STICKY_SECONDS": float(os.getenv("REPLICA_STICKY_SECONDS", 5)),
+    # Как часто проверять доступность реплики и сколько ждать после сбоя.
+    "HEALTH_CHECK_INTERVAL": float(os.getenv("REPLICA_HEALTH_CHECK_INTERVAL", 10)),
+    "RETRY_AFTER": float(os.getenv("REPLICA_RETRY_AFTER", 30)),
+    "CACHE_ALIAS": "catalogue",
+}
+
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Для нескольких воркеров нужен общий бэкенд: django.core.cache.backends.redis.RedisCache
+    # (CATALOGUE_CACHE_LOCATION=redis://...) или на одной машине FileBasedCache с
+    # CATALOGUE_CACHE_LOCATION=/dev/shm/catalogue-cache (общая память через tmpfs). incr у
+    # FileBasedCache не атомарен, поэтому версии каталога меняются через set(), а не incr.
+    "catalogue": {
+        "BACKEND": os.getenv(
+            "CATALOGUE_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CATALOGUE_CACHE_LOCATION", "catalogue"),
+    },
+}
+
+CATALOGUE_CACHE_ALIAS = "catalogue"
+CATALOGUE_CACHE_TIMEOUT = int(os.getenv("CATALOGUE_CACHE_TIMEOUT", 300))
+# Как часто процесс прибавляет свои счётчики попаданий к общим, секунд.
+CATALOGUE_CACHE_STATS_INTERVAL = float(os.getenv("CATALOGUE_CACHE_STATS_INTERVAL", 10))
+
+TOKEN_AUTH_CACHE = {
+    "MAXSIZE": int(os.getenv("TOKEN_AUTH_CACHE_MAXSIZE", 10000)),
+    "TTL": int(os.getenv("TOKEN_AUTH_CACHE_TTL", 300)),
+    "SYNC_INTERVAL": float(os.getenv("TOKEN_AUTH_CACHE_SYNC_INTERVAL", 1)),
+    # Общий для воркеров кэш, через который рассылается сброс записей.
+    # Если он LocMemCache/DummyCache, кэш токенов отключён (токен проверяется в БД на каждый запрос).
+    "CACHE_ALIAS": "catalogue",
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -84,6 +207,17 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Под ASGI (config/asgi.py) регистрация и вход обслуживаются async-view,
+# хеширующими пароли в отдельном ограниченном пуле. 1/0 выбирают явно, пустое
+# значение (None) — по точке входа: asgi.py включает их уже после загрузки настроек.
+ASYNC_AUTH_VIEWS = {"1": True, "0": False}.get(os.getenv("ASYNC_AUTH_VIEWS", ""))
+
+PASSWORD_HASHING = {
+    "MAX_WORKERS": int(os.getenv("PASSWORD_HASHING_MAX_WORKERS", os.cpu_count() or 1)),
+    # 0 — без ограничения; при переполнении async-view отвечают 503.
+    "MAX_QUEUE": int(os.getenv("PASSWORD_HASHING_MAX_QUEUE", 0)),
+}
+
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND")
 EMAIL_HOST = os.getenv("EMAIL_HOST")
 EMAIL_PORT = os.getenv("EMAIL_PORT")
@@ -93,6 +227,16 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 SERVER_EMAIL = EMAIL_HOST_USER
+# Для локальной проверки: EMAIL_BACKEND=django.core.mail.backends.filebased.EmailBackend
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH")
+
+# Очередь исходящих писем (users.OutboundEmail), разбирается командой send_outbox.
+OUTBOX = {
+    "BATCH_SIZE": int(os.getenv("OUTBOX_BATCH_SIZE", 100)),
+    "MAX_ATTEMPTS": int(os.getenv("OUTBOX_MAX_ATTEMPTS", 5)),
+    # Задержка перед повтором удваивается с каждой неудачной попыткой.
+    "BACKOFF_SECONDS": int(os.getenv("OUTBOX_BACKOFF_SECONDS", 60)),
+}
 
 SITE_ID = 1
 
@@ -109,15 +253,58 @@ STATIC_URL = "static/"
 MEDIA_URL = "media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+BACKGROUND_WORKERS = int(os.getenv("BACKGROUND_WORKERS", 2))
+# Сколько уроков удалённого курса удаляется в одной транзакции.
+COURSE_PURGE_CHUNK_SIZE = int(os.getenv("COURSE_PURGE_CHUNK_SIZE", 1000))
+
+# Лента изменений /courses/changes/?since=<курсор>.
+CHANGE_FEED = {
+    "PAGE_SIZE": int(os.getenv("CHANGE_FEED_PAGE_SIZE", 500)),
+    "MAX_PAGE_SIZE": int(os.getenv("CHANGE_FEED_MAX_PAGE_SIZE", 5000)),
+    # Записи об удалении хранятся столько дней; более старый курсор получает 410.
+    "RETENTION_DAYS": int(os.getenv("CHANGE_FEED_RETENTION_DAYS", 30)),
+    # Изменения последних секунд не отдаются: транзакция, начатая раньше,
+    # может закоммитить строку с меньшим updated_at уже после ответа.
+    "SAFETY_LAG_SECONDS": float(os.getenv("CHANGE_FEED_SAFETY_LAG_SECONDS", 2)),
+}
+
+THUMBNAILS = {
+    "FORMAT": os.getenv("THUMBNAILS_FORMAT", "WEBP"),
+    "QUALITY": 80,
+    "SIZES": {
+        "small": (320, 180),
+        "medium": (640, 360),
+    },
+    "AVATAR_SIZES": {
+        "small": (64, 64),
+        "medium": (256, 256),
+    },
+}
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 AUTH_USER_MODEL = "users.User"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "courses.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "courses.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+    "DEFAULT_PAGINATION_CLASS": "courses.pagination.CreatedAtCursorPagination",
+    "PAGE_SIZE": int(os.getenv("PAGE_SIZE", 50)),
+    "MAX_PAGE_SIZE": int(os.getenv("MAX_PAGE_SIZE", 200)),
 }
+
+# auto — orjson, если установлен; json — всегда стандартная библиотека.
+JSON_BACKEND = os.getenv("JSON_BACKEND", "auto")
@@ -0,0 +1,93 @@
+import io
+import posixpath
+from functools import partial
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models.signals import post_save
+from rest_framework import serializers
+
+from config.background import background_pool
+
+EXTENSIONS = {"WEBP": "webp", "JPEG": "jpg"}
+
+
+def get_sizes(sizes_key):
+    return settings.THUMBNAILS[sizes_key]
+
+
+def rendition_name(name, label):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    extension = EXTENSIONS[settings.THUMBNAILS["FORMAT"]]
+    return posixpath.join(directory, "thumbs", f"{stem}_{label}.{extension}")
+
+
+def generate_renditions(name, sizes_key):
+    from PIL import Image, ImageOps
+
+    with default_storage.open(name) as source:
+        image = Image.open(source)
+        # Для JPEG декодируем сразу в уменьшенном масштабе.
+        image.draft("RGB", max(get_sizes(sizes_key).values()))
+        image = ImageOps.exif_transpose(image).convert("RGB")
+
+    for label, size in get_sizes(sizes_key).items():
+        rendition = ImageOps.fit(image, size, Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        rendition.save(
+            buffer, format=settings.THUMBNAILS["FORMAT"], quality=settings.THUMBNAILS["QUALITY"]
+        )
+        target = rendition_name(name, label)
+        if default_storage.exists(target):
+            default_storage.delete(target)
+        default_storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def register_thumbnails(model, field_name, sizes_key="SIZES"):
+    """
+    После сохранения объекта с новым изображением ставит генерацию
+    превью в фоновый пул; запрос не ждёт декодирования и ресайза.
+    """
+
+    def enqueue(sender, instance, **kwargs):
+        image = getattr(instance, field_name)
+        if not image:
+            return
+        labels = get_sizes(sizes_key)
+        if all(default_storage.exists(rendition_name(image.name, label)) for label in labels):
+            return
+        transaction.on_commit(
+            partial(background_pool.submit, generate_renditions, image.name, sizes_key)
+        )
+
+    post_save.connect(
+        enqueue,
+        sender=model,
+        weak=False,
+        dispatch_uid=f"thumbnails:{model._meta.label}:{field_name}",
+    )
+
+
+class ThumbnailsField(serializers.Field):
+    """Словарь {метка: URL} превью для поля изображения."""
+
+    def __init__(self, sizes_key="SIZES", **kwargs):
+        kwargs["read_only"] = True
+        self.sizes_key = sizes_key
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return self.urls_for_name(value.name)
+
+    def urls_for_name(self, name):
+        request = self.context.get("request")
+        urls = {}
+        for label in get_sizes(self.sizes_key):
+            url = default_storage.url(rendition_name(name, label))
+            urls[label] = request.build_absolute_uri(url) if request is not None else url
+        return urls
@@ -1,8 +1,14 @@
-from django.contrib import admin
-from django.urls import path, include
+from django.conf import settings
+from django.urls import URLResolver, include, path
+from django.urls.resolvers import RoutePattern
 
-urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("courses/", include("courses.urls", namespace="courses")),
-    path("users/", include("users.urls", namespace="users")),
-]
+from config import urls_api
+
+# Профиль full: админка и API в одном процессе (см. DJANGO_PROFILE в settings).
+if settings.LAZY_STARTUP:
+    # include() импортирует модуль сразу, а URLResolver со строкой — только когда
+    # путь совпал с префиксом admin/ (или при первом reverse(), который обходит
+    # все маршруты). Запросы к API админку не загружают.
+    urlpatterns = urls_api.urlpatterns + [URLResolver(RoutePattern("admin/"), "config.urls_admin")]
+else:
+    urlpatterns = [path("admin/", include("config.urls_admin"))] + urls_api.urlpatterns
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from django.urls import path
+
+# При SimpleAdminConfig (ленивый запуск) модули admin.py подключаются здесь;
+# при обычном AdminConfig они уже импортированы и вызов ничего не делает.
+admin.autodiscover()
+
+urlpatterns = [
+    path("", admin.site.urls),
+]
@@ -0,0 +1,9 @@
+from django.urls import path, include
+
+from config.instrumentation import RouteTimingAPIView
+
+urlpatterns = [
+    path("courses/", include("courses.urls", namespace="courses")),
+    path("users/", include("users.urls", namespace="users")),
+    path("metrics/timing/", RouteTimingAPIView.as_view(), name="route_timing"),
+]
@@ -0,0 +1,13 @@
+"""
+WSGI-точка входа для профиля api: только DRF-маршруты с сокращённым
+набором middleware (см. DJANGO_PROFILE в config/settings.py).
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("DJANGO_PROFILE", "api")
+
+application = get_wsgi_application()
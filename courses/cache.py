@@ -0,0 +1,112 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = "catalogue:version:{}"
+RESPONSE_KEY = "catalogue:response:{}:{}"
+HITS_KEY = "catalogue:stats:hits"
+MISSES_KEY = "catalogue:stats:misses"
+
+
+def get_cache():
+    return caches[settings.CATALOGUE_CACHE_ALIAS]
+
+
+def get_version(model):
+    cache = get_cache()
+    key = VERSION_KEY.format(model._meta.label_lower)
+    version = cache.get(key)
+    if version is None:
+        # Стартовое значение из часов, а не 1: если ключ версии вытеснен,
+        # он не совпадёт с версией, под которой лежат старые ответы.
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(*models):
+    # Новое значение из часов, а не incr: incr в FileBasedCache — это чтение и
+    # запись без блокировки, и два параллельных увеличения дали бы одну версию.
+    # set() любого нового значения инвалидирует кэш на любом бэкенде.
+    cache = get_cache()
+    cache.set_many(
+        {VERSION_KEY.format(model._meta.label_lower): time.time_ns() for model in models}, timeout=None
+    )
+
+
+def get_versions(models):
+    return ":".join(str(get_version(model)) for model in models)
+
+
+def response_key(request, versions):
+    digest = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return RESPONSE_KEY.format(versions, digest)
+
+
+class StatsCounter:
+    """
+    Попадания и промахи кэша в памяти процесса. В общий кэш они прибавляются
+    одним incr не чаще раза в interval секунд, а не записью на каждое чтение.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._counts = {HITS_KEY: 0, MISSES_KEY: 0}
+        self._flushed_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def count(self, hit):
+        with self._lock:
+            self._counts[HITS_KEY if hit else MISSES_KEY] += 1
+            if time.monotonic() - self._flushed_at < self.interval:
+                return
+        self.flush()
+
+    def pending(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def flush(self):
+        with self._lock:
+            counts = self._counts
+            self._counts = {HITS_KEY: 0, MISSES_KEY: 0}
+            self._flushed_at = time.monotonic()
+        cache = get_cache()
+        for key, delta in counts.items():
+            if not delta:
+                continue
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                if not cache.add(key, delta, timeout=None):
+                    cache.incr(key, delta)
+
+
+stats_counter = StatsCounter(settings.CATALOGUE_CACHE_STATS_INTERVAL)
+
+
+def get_response_data(key):
+    data = get_cache().get(key)
+    stats_counter.count(data is not None)
+    return data
+
+
+def set_response_data(key, data):
+    get_cache().set(key, data, timeout=settings.CATALOGUE_CACHE_TIMEOUT)
+
+
+def get_stats():
+    """Сумма по всем процессам (сброшенное в общий кэш) плюс ещё не сброшенное этим процессом."""
+    cache = get_cache()
+    pending = stats_counter.pending()
+    hits = cache.get(HITS_KEY, 0) + pending[HITS_KEY]
+    misses = cache.get(MISSES_KEY, 0) + pending[MISSES_KEY]
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / total, 4) if total else None,
+    }
@@ -0,0 +1,160 @@
+import base64
+import binascii
+import contextvars
+import datetime
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from config.db_router import use_primary
+from courses import json_backend
+from courses.models import Course, Lesson, Tombstone
+
+_pending = contextvars.ContextVar("tombstones_pending", default=None)
+
+KINDS = {Course: Tombstone.COURSE, Lesson: Tombstone.LESSON}
+
+
+class InvalidCursor(ValueError):
+    """Курсор не удаётся разобрать."""
+
+
+class ExpiredCursor(Exception):
+    """Курсор старше срока хранения записей об удалении: нужна полная синхронизация."""
+
+
+def record_deletion(model, pks):
+    """
+    Записывает удаление объектов в ленту изменений. Внутри batched_tombstones()
+    записи копятся и вставляются одним bulk_create при выходе из блока.
+    """
+    now = timezone.now()
+    tombstones = [Tombstone(kind=KINDS[model], object_id=pk, deleted_at=now) for pk in pks]
+    pending = _pending.get()
+    if pending is not None:
+        pending.extend(tombstones)
+        return
+    Tombstone.objects.bulk_create(tombstones)
+
+
+@contextmanager
+def batched_tombstones():
+    """Для пакетных удалений: одна вставка вместо INSERT на каждый объект."""
+    pending = []
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    Tombstone.objects.bulk_create(pending)
+
+
+def encode_cursor(positions):
+    data = {stream: [value.isoformat(), pk] for stream, (value, pk) in positions.items()}
+    return base64.urlsafe_b64encode(json_backend.dumps(data)).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        data = json_backend.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        positions = {
+            stream: (datetime.datetime.fromisoformat(data[stream][0]), int(data[stream][1]))
+            for stream in ("courses", "lessons", "deleted")
+            if stream in data
+        }
+    except (binascii.Error, ValueError, TypeError, KeyError, IndexError) as exc:
+        raise InvalidCursor(str(exc))
+    # Наши курсоры всегда с часовым поясом; наивное время сравнить с now() нельзя.
+    if any(timezone.is_naive(value) for value, _ in positions.values()):
+        raise InvalidCursor("Время в курсоре без часового пояса")
+    return positions
+
+
+def _after(queryset, field, position):
+    if position is None:
+        return queryset
+    value, pk = position
+    return queryset.filter(Q(**{f"{field}__gt": value}) | Q(**{field: value, "pk__gt": pk}))
+
+
+def _page(queryset, field, position, upper, limit):
+    """
+    Следующие limit строк потока по ключу (field, id) строго до upper.
+    Если поток исчерпан, позиция переходит на (upper, 0), чтобы курсор
+    не старел, пока изменений нет.
+    """
+    rows = list(
+        _after(queryset.filter(**{f"{field}__lt": upper}), field, position).order_by(field, "pk")[:limit]
+    )
+    if len(rows) == limit:
+        last = rows[-1]
+        return rows, (getattr(last, field), last.pk), True
+    return rows, (upper, 0), False
+
+
+def changes_since(cursor, limit):
+    """
+    Изменённые и удалённые с позиции курсора курсы и уроки: три независимых
+    keyset-потока по (updated_at, id) курсов и уроков и (deleted_at, id)
+    записей об удалении. Без курсора отдаётся весь каталог, а удаления
+    считаются с момента первого запроса.
+    """
+    upper = timezone.now() - datetime.timedelta(seconds=settings.CHANGE_FEED["SAFETY_LAG_SECONDS"])
+    if cursor:
+        positions = decode_cursor(cursor)
+        retention = datetime.timedelta(days=settings.CHANGE_FEED["RETENTION_DAYS"])
+        if "deleted" not in positions or positions["deleted"][0] < timezone.now() - retention:
+            raise ExpiredCursor()
+    else:
+        positions = {"deleted": (upper, 0)}
+
+    # Только основная БД: реплика может отставать больше SAFETY_LAG_SECONDS, и
+    # курсор ушёл бы дальше строк, которые на ней ещё не видны.
+    with use_primary():
+        courses, courses_position, more_courses = _page(
+            Course.objects.alive(),
+            "updated_at",
+            positions.get("courses"),
+            upper,
+            limit,
+        )
+        lessons, lessons_position, more_lessons = _page(
+            Lesson.objects.alive(),
+            "updated_at",
+            positions.get("lessons"),
+            upper,
+            limit,
+        )
+        tombstones, deleted_position, more_deleted = _page(
+            Tombstone.objects.all(), "deleted_at", positions.get("deleted"), upper, limit
+        )
+    return {
+        "courses": courses,
+        "lessons": lessons,
+        # Удаление курса означает и удаление всех его уроков.
+        "deleted": {
+            "courses": [
+                tombstone.object_id for tombstone in tombstones if tombstone.kind == Tombstone.COURSE
+            ],
+            "lessons": [
+                tombstone.object_id for tombstone in tombstones if tombstone.kind == Tombstone.LESSON
+            ],
+        },
+        "cursor": encode_cursor(
+            {"courses": courses_position, "lessons": lessons_position, "deleted": deleted_position}
+        ),
+        "has_more": more_courses or more_lessons or more_deleted,
+    }
+
+
+def prune_tombstones(batch_size=1000):
+    """Удаляет записи об удалении старше срока хранения пачками; возвращает их число."""
+    cutoff = timezone.now() - datetime.timedelta(days=settings.CHANGE_FEED["RETENTION_DAYS"])
+    pruned = 0
+    while True:
+        ids = list(Tombstone.objects.filter(deleted_at__lt=cutoff).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return pruned
+        pruned += Tombstone.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,81 @@
+import contextvars
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from courses.models import Course, Lesson
+
+_pending = contextvars.ContextVar("lessons_count_pending", default=None)
+
+
+def change_lessons_count(deltas):
+    """
+    Изменяет Course.lessons_count на {course_id: delta} через F(), без чтения
+    счётчика. Внутри batched_lessons_count() изменения копятся до выхода из блока.
+    """
+    pending = _pending.get()
+    if pending is not None:
+        pending.update(deltas)
+        return
+    apply_lessons_count(deltas)
+
+
+def apply_lessons_count(deltas, using=DEFAULT_DB_ALIAS):
+    """
+    Один UPDATE на каждое различное значение delta; updated_at меняется для ETag.
+    Разошедшийся счётчик не уходит ниже нуля (CHECK у PositiveIntegerField) —
+    его исправляет reconcile_lessons_count.
+    """
+    by_delta = defaultdict(list)
+    for course_id, delta in deltas.items():
+        if course_id is not None and delta:
+            by_delta[delta].append(course_id)
+    now = timezone.now()
+    for delta, course_ids in by_delta.items():
+        Course.objects.using(using).filter(pk__in=course_ids).update(
+            lessons_count=Greatest(F("lessons_count") + delta, 0), updated_at=now
+        )
+
+
+@contextmanager
+def batched_lessons_count():
+    """Для пакетных операций: изменения счётчиков применяются разом при успешном выходе."""
+    pending = Counter()
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+    apply_lessons_count(pending)
+
+
+def lessons_count_drift():
+    """Курсы, у которых lessons_count расходится с фактическим числом уроков."""
+    return Course.objects.annotate(actual=Coalesce(Subquery(_actual_counts()), 0)).exclude(
+        lessons_count=F("actual")
+    )
+
+
+def reconcile_lessons_count(course_ids):
+    """
+    Пересчитывает счётчик указанных курсов одним UPDATE с подзапросом.
+    updated_at меняется в том же UPDATE: по нему строятся ETag курса и
+    лента изменений, иначе клиенты не увидят исправленный счётчик.
+    """
+    return Course.objects.filter(pk__in=course_ids).update(
+        lessons_count=Coalesce(Subquery(_actual_counts()), 0), updated_at=timezone.now()
+    )
+
+
+def _actual_counts():
+    return (
+        Lesson.objects.filter(course=OuterRef("pk"))
+        .order_by()
+        .values("course")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
@@ -0,0 +1,73 @@
+import logging
+from functools import partial
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from config.background import background_pool
+from courses.cache import bump_version
+from courses.changes import record_deletion
+from courses.models import Course, Lesson
+
+logger = logging.getLogger(__name__)
+
+
+def mark_deleted(course):
+    """
+    Скрывает курс сразу (одним UPDATE), а его уроки удаляются после коммита
+    в фоновом потоке пачками, чтобы запрос не держал долгую транзакцию.
+    """
+    course.deleted_at = timezone.now()
+    course.save(update_fields=["deleted_at", "updated_at"])
+    # Для клиентов ленты изменений курс удалён уже сейчас, вместе с уроками.
+    record_deletion(Course, [course.pk])
+    # Уроки удалённого курса пропадают из выдачи уроков.
+    transaction.on_commit(partial(bump_version, Lesson, Course))
+    transaction.on_commit(partial(background_pool.submit, purge_course, course.pk))
+
+
+def purge_course(course_id, chunk_size=None, progress=None):
+    """
+    Удаляет уроки помеченного курса пачками по chunk_size, каждая в своей
+    короткой транзакции, затем сам курс. Прогресс пишется в лог и, если
+    передан, в progress(deleted, total).
+
+    Каждая пачка удаляется под блокировкой строки курса (SELECT ... FOR
+    UPDATE SKIP LOCKED): если её держит другой процесс, удаляющий тот же
+    курс, этот выходит и оставляет работу ему.
+    """
+    chunk_size = chunk_size or settings.COURSE_PURGE_CHUNK_SIZE
+    total = Lesson.objects.filter(course_id=course_id).count()
+    table = connection.ops.quote_name(Lesson._meta.db_table)
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            marked = Course.objects.select_for_update(skip_locked=True).filter(
+                pk=course_id, deleted_at__isnull=False
+            )
+            if not marked.exists():
+                # Курс не помечен, уже удалён или его сейчас удаляет другой процесс.
+                return deleted
+            ids = list(Lesson.objects.filter(course_id=course_id).values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                Course.objects.filter(pk=course_id).delete()
+                break
+            # Без коллектора и сигналов на каждый урок: один DELETE на пачку.
+            with connection.cursor() as cursor:
+                cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+            deleted += len(ids)
+            # Счётчик показывает, сколько уроков осталось удалить; вычитание, а не
+            # total - deleted, остаётся верным, если пачки удалял и другой процесс.
+            Course.objects.filter(pk=course_id).update(
+                lessons_count=Greatest(F("lessons_count") - len(ids), 0)
+            )
+        logger.info("Курс %s: удалено %d из %d уроков", course_id, deleted, total)
+        if progress:
+            progress(deleted, total)
+
+    bump_version(Lesson, Course)
+    logger.info("Курс %s удалён вместе с %d уроками", course_id, deleted)
+    return deleted
@@ -0,0 +1,145 @@
+from django.core.files.storage import default_storage
+from django.db import models
+from django.utils import timezone
+from django.utils.encoding import iri_to_uri
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+
+from config.thumbnails import ThumbnailsField, get_sizes, rendition_name
+
+
+class RowSerializer:
+    """
+    Быстрый read-only путь: строит выдачу из values() с заранее подобранными
+    конвертерами полей вместо ModelSerializer.to_representation на каждую строку.
+    Результат совпадает с выдачей исходного сериализатора байт в байт.
+    """
+
+    def __init__(self, keys, columns, converters):
+        self.keys = keys
+        self.columns = columns
+        self.converters = converters
+
+    @classmethod
+    def compile(cls, serializer):
+        """Возвращает RowSerializer или None, если какое-то поле не поддерживается."""
+        model = serializer.Meta.model
+        concrete = {field.name: field for field in model._meta.concrete_fields}
+        keys, columns, converters = [], [], []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            model_field = concrete.get(field.source)
+            if model_field is None:
+                return None
+            converter = cls.build_converter(field, model_field)
+            if converter is False:
+                return None
+            keys.append(name)
+            columns.append(field.source)
+            converters.append(converter)
+        return cls(keys, columns, converters)
+
+    @staticmethod
+    def build_converter(field, model_field):
+        """None — значение отдаётся как есть, False — поле не поддерживается."""
+        if isinstance(field, ThumbnailsField):
+            return _thumbnails_converter(field)
+        if isinstance(field, serializers.FileField):
+            return _file_converter(field, model_field)
+        if isinstance(field, serializers.DateTimeField):
+            return _datetime_converter(field)
+        if isinstance(field, serializers.PrimaryKeyRelatedField):
+            return None if not field.pk_field else False
+        if isinstance(field, serializers.CharField) and isinstance(
+            model_field, (models.CharField, models.TextField)
+        ):
+            return None
+        if isinstance(field, serializers.IntegerField) and isinstance(model_field, models.IntegerField):
+            return None
+        if isinstance(field, serializers.BooleanField) and isinstance(model_field, models.BooleanField):
+            return None
+        return False
+
+    def values_columns(self, extra=()):
+        return list(dict.fromkeys([*self.columns, *extra]))
+
+    def serialize(self, rows):
+        return list(self.iter_serialize(rows))
+
+    def iter_serialize(self, rows):
+        """Ленивый вариант serialize() для потоковой выдачи."""
+        items = list(zip(self.keys, self.columns, self.converters))
+        for row in rows:
+            item = {}
+            for key, column, converter in items:
+                value = row[column]
+                if value is not None and converter is not None:
+                    value = converter(value)
+                item[key] = value
+            yield item
+
+
+def _absolute_url_builder(request):
+    """Эквивалент request.build_absolute_uri(url) с вычисленным один раз префиксом."""
+    if request is None:
+        return lambda url: url
+    prefix = request.build_absolute_uri("/")[:-1]
+
+    def build(url):
+        if url.startswith("/") and not url.startswith("//") and "/./" not in url and "/../" not in url:
+            return iri_to_uri(prefix + url)
+        return request.build_absolute_uri(url)
+
+    return build
+
+
+def _file_converter(field, model_field):
+    storage = model_field.storage
+    use_url = getattr(field, "use_url", api_settings.UPLOADED_FILES_USE_URL)
+    build = _absolute_url_builder(field.context.get("request"))
+
+    def convert(name):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        return build(storage.url(name))
+
+    return convert
+
+
+def _thumbnails_converter(field):
+    labels = list(get_sizes(field.sizes_key))
+    build = _absolute_url_builder(field.context.get("request"))
+
+    def convert(name):
+        if not name:
+            return None
+        return {label: build(default_storage.url(rendition_name(name, label))) for label in labels}
+
+    return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None:
+        return None
+    field_timezone = field.timezone if hasattr(field, "timezone") else field.default_timezone()
+    iso = output_format.lower() == ISO_8601
+
+    def convert(value):
+        if isinstance(value, str):
+            return value
+        if field_timezone is not None and timezone.is_aware(value):
+            value = value.astimezone(field_timezone)
+        else:
+            value = field.enforce_timezone(value)
+        if iso:
+            value = value.isoformat()
+            if value.endswith("+00:00"):
+                value = value[:-6] + "Z"
+            return value
+        return value.strftime(output_format)
+
+    return convert
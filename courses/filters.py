@@ -0,0 +1,17 @@
+from rest_framework.filters import BaseFilterBackend
+
+from courses.search import search
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    search_param = "search"
+
+    @classmethod
+    def get_search_query(cls, request):
+        return request.query_params.get(cls.search_param, "").strip()
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        if not query:
+            return queryset
+        return search(queryset, query)
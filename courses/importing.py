@@ -0,0 +1,131 @@
+import csv
+from collections import Counter
+
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from courses import json_backend
+from courses.cache import bump_version
+from courses.counters import change_lessons_count
+from courses.models import Course, Lesson
+from courses.seeding import copy_rows, supports_copy
+from courses.serializers import LessonSerializer, preload_courses
+
+FORMATS = ("ndjson", "csv")
+
+
+def guess_format(name, default="ndjson"):
+    extension = name.rsplit(".", 1)[-1].lower() if name and "." in name else ""
+    if extension in ("jsonl", "ndjson"):
+        return "ndjson"
+    return extension if extension in FORMATS else default
+
+
+def read_records(lines, file_format):
+    """
+    Построчно разбирает NDJSON или CSV из итератора байтовых строк, не читая
+    файл целиком. Отдаёт (номер строки, словарь, None) или (номер строки, None, ошибки).
+    """
+    if file_format == "csv":
+        reader = csv.reader(line.decode("utf-8-sig") for line in lines)
+        header = next(reader, None)
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                yield reader.line_num, None, {"non_field_errors": ["Число колонок не совпадает с заголовком"]}
+                continue
+            # Пустая ячейка означает отсутствующее значение.
+            yield reader.line_num, {key: value for key, value in zip(header, row) if value != ""}, None
+        return
+
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json_backend.loads(line)
+        except ValueError:
+            yield number, None, {"non_field_errors": ["Некорректный JSON"]}
+            continue
+        if not isinstance(data, dict):
+            yield number, None, {"non_field_errors": ["Ожидается JSON-объект"]}
+            continue
+        yield number, data, None
+
+
+class LessonImporter:
+    """
+    Импорт уроков пачками: каждая пачка валидируется LessonSerializer с
+    заранее загруженными курсами и вставляется в своей транзакции одним COPY
+    (PostgreSQL) или bulk_create. Ошибки собираются в отчёт с номерами строк.
+    """
+
+    def __init__(self, batch_size=1000, max_errors=1000, context=None):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.context = context or {}
+        self.report = {"lines": 0, "created": 0, "error_count": 0, "errors": []}
+
+    def run(self, records):
+        batch = []
+        for record in records:
+            self.report["lines"] += 1
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        if self.report["created"]:
+            transaction.on_commit(lambda: bump_version(Lesson, Course))
+        return self.report
+
+    def flush(self, batch):
+        rows = [data for _, data, _ in batch if data is not None]
+        serializer = LessonSerializer(context={**self.context, "preloaded": preload_courses(rows)})
+        lessons = []
+        for number, data, errors in batch:
+            if errors:
+                self.add_error(number, errors)
+                continue
+            try:
+                attrs = serializer.run_validation(data)
+            except ValidationError as exc:
+                self.add_error(number, exc.detail)
+                continue
+            lessons.append(Lesson(**attrs))
+        if lessons:
+            with transaction.atomic():
+                self.insert(lessons)
+                change_lessons_count(Counter(lesson.course_id for lesson in lessons))
+            self.report["created"] += len(lessons)
+
+    def insert(self, lessons):
+        """На PostgreSQL пачка загружается через COPY, иначе через bulk_create."""
+        if not supports_copy(connection):
+            Lesson.objects.bulk_create(lessons)
+            return
+        now = timezone.now()
+        copy_rows(
+            connection,
+            Lesson,
+            ("title", "course_id", "description", "preview", "video_url", "created_at", "updated_at"),
+            (
+                (
+                    lesson.title,
+                    lesson.course_id,
+                    lesson.description,
+                    lesson.preview.name or None,
+                    lesson.video_url,
+                    now,
+                    now,
+                )
+                for lesson in lessons
+            ),
+        )
+
+    def add_error(self, number, errors):
+        self.report["error_count"] += 1
+        if len(self.report["errors"]) < self.max_errors:
+            self.report["errors"].append({"line": number, "errors": errors})
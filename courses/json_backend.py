@@ -0,0 +1,78 @@
+import json
+import math
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.json import strict_constant
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if settings.JSON_BACKEND == "orjson" and orjson is None:
+    raise ImproperlyConfigured("JSON_BACKEND=orjson, но пакет orjson не установлен")
+
+# Как в DRF: при STRICT_JSON NaN и Infinity не пишутся и не принимаются.
+strict = api_settings.STRICT_JSON
+
+# auto: orjson, если установлен, иначе стандартный json. Без STRICT_JSON DRF пишет
+# NaN/Infinity как есть, а orjson — как null и не разбирает их: тогда только stdlib.
+fast = orjson is not None and settings.JSON_BACKEND != "json" and strict
+
+# Всё, что orjson не умеет сам (Decimal, ленивые строки, datetime), кодируется
+# тем же JSONEncoder, что и в JSONRenderer DRF.
+_default = JSONEncoder().default
+_options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if fast else 0
+
+
+def dumps(data):
+    """
+    Компактный JSON в UTF-8 (bytes), побайтно как у JSONRenderer DRF без
+    отступов: U+2028/U+2029 экранируются, NaN и Infinity при STRICT_JSON
+    дают ValueError.
+    """
+    if fast:
+        _check_finite(data)
+        body = orjson.dumps(data, default=_default, option=_options)
+    else:
+        body = json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, allow_nan=not strict, separators=(",", ":")
+        ).encode()
+    # Разделители строк допустимы в JSON, но не в строковых литералах JavaScript.
+    # Сначала поиск одного последнего байта (memchr): поиск трёхбайтовой
+    # последовательности по мегабайтам кириллицы в разы медленнее самого orjson.
+    if (b"\xa8" in body or b"\xa9" in body) and (b"\xe2\x80\xa8" in body or b"\xe2\x80\xa9" in body):
+        body = body.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return body
+
+
+def loads(data):
+    """Разбирает bytes или str; ошибки — ValueError (json.JSONDecodeError)."""
+    if fast:
+        return orjson.loads(data)
+    return json.loads(data, parse_constant=strict_constant if strict else None)
+
+
+def _check_finite(data):
+    """
+    orjson пишет NaN и Infinity как null, а json.dumps(allow_nan=False) падает.
+    Обход без рекурсии; строки, целые и None (почти все значения ответа)
+    отсеиваются сравнением типа, не доходя до isinstance.
+    """
+    if not isinstance(data, (dict, list, tuple)):
+        data = [data]
+    containers = [data]
+    while containers:
+        container = containers.pop()
+        for value in container.values() if isinstance(container, dict) else container:
+            kind = type(value)
+            if kind is str or kind is int or value is None:
+                continue
+            if isinstance(value, float):
+                if not math.isfinite(value):
+                    raise ValueError(f"Out of range float values are not JSON compliant: {value!r}")
+            elif isinstance(value, (dict, list, tuple)):
+                containers.append(value)
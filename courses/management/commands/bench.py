@@ -0,0 +1,314 @@
+import itertools
+import json
+import statistics
+import time
+import tracemalloc
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+from rest_framework.authtoken.models import Token
+
+from config.background import background_pool
+from config.db_router import replica_pool
+from courses.cache import get_cache
+from courses.models import Course, Lesson
+from courses.seeding import Seeder
+from users.models import User
+
+PASSWORD = "bench-password-1"
+
+
+class Scenario:
+    def __init__(self, name, method, url, data=None, setup=None, heavy=False):
+        self.name = name
+        self.method = method
+        self.url = url
+        self.data = data
+        self.setup = setup
+        self.heavy = heavy
+
+    def prepare(self, counter):
+        """Возвращает (url, data, context) для очередного запроса; подготовка не входит в замер."""
+        context = self.setup(counter) if self.setup else {}
+        url = self.url(context) if callable(self.url) else self.url
+        data = self.data(context) if callable(self.data) else self.data
+        return url, data, context
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный замер всех маршрутов courses и users на тестовой БД: "
+        "p50/p95/p99, число SQL-запросов и аллокации, отчёт в JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=50)
+        parser.add_argument("--lessons-per-course", type=int, default=20)
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--iterations", type=int, default=30)
+        parser.add_argument(
+            "--heavy-iterations",
+            type=int,
+            default=5,
+            help="Итераций для маршрутов с хешированием пароля",
+        )
+        parser.add_argument(
+            "--asgi",
+            action="store_true",
+            help="Запросы через ASGI (AsyncClient); для async-входа задайте ASYNC_AUTH_VIEWS=1",
+        )
+        parser.add_argument("--cold-cache", action="store_true", help="Очищать кэш каталога перед запросом")
+        parser.add_argument("--only", nargs="*", help="Запустить только перечисленные сценарии")
+        parser.add_argument("--output", help="Файл для JSON-отчёта (по умолчанию stdout)")
+        parser.add_argument("--baseline", help="JSON-отчёт предыдущего прогона для сравнения")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Допустимый относительный рост p95 относительно baseline",
+        )
+        parser.add_argument("--keepdb", action="store_true")
+
+    def handle(self, *args, **options):
+        self.options = options
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=options["keepdb"])
+        # Фоновые задачи (удаление уроков, превью) выполняются внутри запроса,
+        # чтобы не конкурировать с замером за тестовую БД.
+        background_pool.eager = True
+        # Реплики на время замера смотрят в ту же тестовую БД.
+        for alias in replica_pool.aliases:
+            connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+        try:
+            self.seed()
+            report = self.run_scenarios()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+            teardown_test_environment()
+
+        output = json.dumps(report, ensure_ascii=False, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(output)
+        else:
+            self.stdout.write(output)
+
+        if options["baseline"]:
+            self.compare(report, options["baseline"], options["threshold"])
+
+    def seed(self):
+        seeder = Seeder(seed=0)
+        seeder.seed_users(self.options["users"], PASSWORD)
+        course_ids = seeder.seed_courses(self.options["courses"])
+        seeder.seed_lessons(course_ids, self.options["lessons_per_course"])
+
+        self.admin = User.objects.create(
+            email="admin@example.com", password=make_password(PASSWORD), is_staff=True
+        )
+        self.user = User.objects.exclude(pk=self.admin.pk).order_by("pk").first()
+        self.admin_token = Token.objects.create(user=self.admin).key
+        self.course_id = course_ids[0]
+        self.lesson_id = Lesson.objects.filter(course_id=self.course_id).values_list("pk", flat=True).first()
+
+    def scenarios(self):
+        def new_course(counter):
+            return {"pk": Course.objects.create(title=f"Удаляемый курс {counter}").pk}
+
+        def new_lesson(counter):
+            return {
+                "pk": Lesson.objects.create(title=f"Удаляемый урок {counter}", course_id=self.course_id).pk
+            }
+
+        def new_token(counter):
+            user = User.objects.create(email=f"logout{counter}@example.com")
+            return {"token": Token.objects.create(user=user).key}
+
+        course, lesson = self.course_id, self.lesson_id
+        return [
+            Scenario("courses:courses-list", "get", "/courses/"),
+            Scenario("courses:courses-list?expand", "get", "/courses/?expand=lessons"),
+            Scenario("courses:courses-list?search", "get", "/courses/?search=django"),
+            Scenario("courses:courses-list?fields", "get", "/courses/?fields=id,title"),
+            Scenario("courses:courses-detail", "get", f"/courses/{course}/"),
+            Scenario("courses:courses-outline", "get", f"/courses/{course}/outline/"),
+            Scenario("courses:courses-export", "get", "/courses/export/"),
+            Scenario("courses:courses-create", "post", "/courses/", {"title": "Новый курс"}),
+            Scenario("courses:courses-update", "patch", f"/courses/{course}/", {"title": "Курс 0"}),
+            Scenario("courses:courses-delete", "delete", lambda c: f"/courses/{c['pk']}/", setup=new_course),
+            Scenario("courses:lessons", "get", "/courses/lessons/"),
+            Scenario("courses:lesson_export", "get", "/courses/lessons/export/?format=csv"),
+            Scenario("courses:lesson_retrieve", "get", f"/courses/lessons/{lesson}/"),
+            Scenario(
+                "courses:lesson_create",
+                "post",
+                "/courses/lessons/create/",
+                {"title": "Новый урок", "course": course},
+            ),
+            Scenario(
+                "courses:lesson_update", "patch", f"/courses/lessons/{lesson}/update/", {"title": "Урок 0"}
+            ),
+            Scenario(
+                "courses:lesson_delete",
+                "delete",
+                lambda c: f"/courses/lessons/{c['pk']}/delete/",
+                setup=new_lesson,
+            ),
+            Scenario(
+                "courses:lesson_bulk",
+                "post",
+                "/courses/lessons/bulk/",
+                {"create": [{"title": f"Пакетный урок {i}", "course": course} for i in range(50)]},
+            ),
+            Scenario(
+                "courses:lesson_import",
+                "post",
+                "/courses/lessons/import/",
+                {"title": "Импортированный урок", "course": course},
+            ),
+            Scenario("courses:cache_stats", "get", "/courses/cache/stats/"),
+            Scenario("courses:changes", "get", "/courses/changes/?limit=500"),
+            Scenario(
+                "users:register",
+                "post",
+                "/users/register/",
+                lambda c: {"email": c["email"], "password1": PASSWORD, "password2": PASSWORD},
+                setup=lambda counter: {"email": f"new{counter}@example.com"},
+                heavy=True,
+            ),
+            Scenario(
+                "users:login",
+                "post",
+                "/users/login/",
+                {"email": self.user.email, "password": PASSWORD},
+                heavy=True,
+            ),
+            Scenario("users:logout", "post", "/users/logout/", setup=new_token),
+            Scenario("users:profile-detail", "get", f"/users/profile/{self.admin.pk}/"),
+            Scenario("users:profile-update", "patch", f"/users/profile/{self.admin.pk}/", {"city": "Москва"}),
+            Scenario("users:hashing_stats", "get", "/users/hashing/stats/"),
+        ]
+
+    def request(self, method, url, data, token):
+        headers = {"Authorization": f"Token {token}"}
+        kwargs = {"content_type": "application/json", "headers": headers}
+        if data is not None:
+            kwargs["data"] = json.dumps(data)
+        if self.options["asgi"]:
+            return async_to_sync(self.arequest)(method, url, kwargs)
+        response = getattr(Client(), method)(url, **kwargs)
+        if response.streaming:
+            # Потоковый ответ замеряется целиком, до последнего байта.
+            b"".join(response.streaming_content)
+        return response
+
+    async def arequest(self, method, url, kwargs):
+        response = await getattr(AsyncClient(), method)(url, **kwargs)
+        if response.streaming:
+            if response.is_async:
+                [chunk async for chunk in response.streaming_content]
+            else:
+                b"".join(response.streaming_content)
+        return response
+
+    def run_scenarios(self):
+        selected = self.options["only"]
+        scenarios = [s for s in self.scenarios() if not selected or s.name in selected]
+        counter = itertools.count()
+        results = {}
+        exercised = set()
+        for scenario in scenarios:
+            iterations = self.options["heavy_iterations"] if scenario.heavy else self.options["iterations"]
+            latencies, queries, statuses = [], [], set()
+            # Первый запрос прогревает кэши и не учитывается.
+            for index in range(iterations + 1):
+                url, data, context = scenario.prepare(next(counter))
+                token = context.get("token", self.admin_token)
+                if self.options["cold_cache"]:
+                    get_cache().clear()
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = self.request(scenario.method, url, data, token)
+                    elapsed = time.perf_counter() - started
+                statuses.add(response.status_code)
+                if index:
+                    latencies.append(elapsed * 1000)
+                    queries.append(len(captured))
+            exercised.add(resolve(url.split("?")[0]).view_name)
+
+            url, data, context = scenario.prepare(next(counter))
+            tracemalloc.start()
+            self.request(scenario.method, url, data, context.get("token", self.admin_token))
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            results[scenario.name] = {
+                "method": scenario.method.upper(),
+                "iterations": iterations,
+                "status": sorted(statuses),
+                "p50_ms": round(percentile(latencies, 50), 3),
+                "p95_ms": round(percentile(latencies, 95), 3),
+                "p99_ms": round(percentile(latencies, 99), 3),
+                "mean_ms": round(statistics.fmean(latencies), 3),
+                "queries": round(statistics.fmean(queries), 1),
+                "alloc_peak_kib": round(peak / 1024, 1),
+            }
+            self.stderr.write(f"{scenario.name}: p50={results[scenario.name]['p50_ms']} мс")
+
+        missing = sorted(self.route_names() - exercised)
+        if missing and not selected:
+            self.stderr.write(self.style.WARNING(f"Маршруты без сценариев: {', '.join(missing)}"))
+        return {
+            "meta": {
+                "transport": "asgi" if self.options["asgi"] else "wsgi",
+                "profile": settings.DJANGO_PROFILE,
+                "vendor": connection.vendor,
+                "courses": self.options["courses"],
+                "lessons_per_course": self.options["lessons_per_course"],
+                "users": self.options["users"],
+                "cold_cache": self.options["cold_cache"],
+            },
+            "results": results,
+        }
+
+    @staticmethod
+    def route_names():
+        names = set()
+
+        def walk(patterns, namespace):
+            for pattern in patterns:
+                if isinstance(pattern, URLResolver):
+                    walk(pattern.url_patterns, pattern.namespace or namespace)
+                elif isinstance(pattern, URLPattern) and namespace in ("courses", "users") and pattern.name:
+                    names.add(f"{namespace}:{pattern.name}")
+
+        walk(get_resolver().url_patterns, None)
+        return names
+
+    def compare(self, report, baseline_path, threshold):
+        with open(baseline_path) as file:
+            baseline = json.load(file)["results"]
+        regressions = []
+        for name, current in report["results"].items():
+            previous = baseline.get(name)
+            if previous is None:
+                continue
+            if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+                regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} мс")
+            if current["queries"] > previous["queries"]:
+                regressions.append(f"{name}: SQL-запросов {previous['queries']} -> {current['queries']}")
+        if regressions:
+            raise CommandError("Регрессии относительно baseline:\n" + "\n".join(regressions))
+        self.stderr.write(self.style.SUCCESS("Регрессий относительно baseline нет"))
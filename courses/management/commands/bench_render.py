@@ -0,0 +1,100 @@
+import io
+import random
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from config.compression import Compressor, brotli
+from courses import json_backend
+from courses.models import Course, Lesson
+from courses.parsers import FastJSONParser
+from courses.renderers import FastJSONRenderer
+from courses.seeding import WORDS
+from courses.serializers import LessonSerializer
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+class Command(BaseCommand):
+    help = (
+        "Время кодирования/разбора JSON (stdlib и orjson) и размер списка уроков "
+        "на проводе без сжатия, с gzip и brotli"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Уроков в ответе")
+        parser.add_argument("--description-length", type=int, default=2000, help="Символов в description")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        # Данные создаются внутри транзакции и откатываются в конце.
+        with transaction.atomic():
+            course = Course.objects.create(title="bench")
+            # Случайные слова, а не повтор одной фразы: иначе сжатие выглядит нереально хорошим.
+            rng = random.Random(0)
+            words = options["description_length"] // 8
+            Lesson.objects.bulk_create(
+                Lesson(title=f"Урок {i}", description=" ".join(rng.choices(WORDS, k=words)), course=course)
+                for i in range(options["rows"])
+            )
+            context = {"request": Request(RequestFactory().get("/courses/lessons/"))}
+            lessons = Lesson.objects.filter(course=course).order_by("created_at", "id")
+            data = {
+                "next": None,
+                "previous": None,
+                "results": LessonSerializer(lessons, many=True, context=context).data,
+            }
+            transaction.set_rollback(True)
+
+        renderers = {"json (DRF)": (JSONRenderer(), JSONParser())}
+        if json_backend.fast:
+            renderers["orjson"] = (FastJSONRenderer(), FastJSONParser())
+        else:
+            self.stdout.write(self.style.WARNING("orjson не установлен или JSON_BACKEND=json: только stdlib"))
+
+        bodies = {}
+        for name, (renderer, parser) in renderers.items():
+            encode, body = best_time(lambda: renderer.render(data), repeat)
+            bodies[name] = body
+            decode, _ = best_time(lambda: parser.parse(io.BytesIO(body)), repeat)
+            self.stdout.write(
+                f"{name:<12} кодирование {encode * 1000:>8.2f} мс   разбор {decode * 1000:>8.2f} мс   "
+                f"{len(body) / 1024:>9.1f} КиБ"
+            )
+
+        if len(set(bodies.values())) > 1:
+            self.stdout.write(self.style.WARNING("Ответы рендереров различаются побайтно"))
+
+        compression = settings.COMPRESSION
+        encodings = {f"gzip-{compression['GZIP_LEVEL']}": "gzip"}
+        if brotli is not None:
+            encodings[f"br-{compression['BROTLI_QUALITY']}"] = "br"
+        else:
+            self.stdout.write(self.style.WARNING("brotli не установлен: только gzip"))
+        self.stdout.write(f"{'без сжатия':<12} {len(body) / 1024:>9.1f} КиБ")
+        for name, encoding in encodings.items():
+
+            def compress():
+                compressor = Compressor(encoding, compression)
+                return compressor.compress(body) + compressor.finish()
+
+            elapsed, compressed = best_time(compress, repeat)
+            self.stdout.write(
+                f"{name:<12} {len(compressed) / 1024:>9.1f} КиБ ({len(compressed) / len(body):>6.1%})   "
+                f"сжатие {elapsed * 1000:>8.2f} мс"
+            )
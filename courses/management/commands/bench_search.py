@@ -0,0 +1,37 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from courses.models import Course, Lesson
+from courses.search import icontains_scan, search
+
+
+class Command(BaseCommand):
+    help = "Сравнивает полнотекстовый поиск по search_vector с поиском через icontains"
+
+    def add_arguments(self, parser):
+        parser.add_argument("queries", nargs="+", help="Поисковые запросы")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--limit", type=int, default=50)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stdout.write(
+                self.style.WARNING("Не PostgreSQL: полнотекстовый поиск работает через icontains")
+            )
+
+        for model in (Course, Lesson):
+            for query in options["queries"]:
+                for name, method in (("fts", search), ("icontains", icontains_scan)):
+                    timings = []
+                    for _ in range(options["repeat"]):
+                        started = time.perf_counter()
+                        found = len(method(model.objects.all(), query)[: options["limit"]])
+                        timings.append((time.perf_counter() - started) * 1000)
+                    self.stdout.write(
+                        f"{model.__name__:<7} {name:<10} {query!r:<20} "
+                        f"найдено={found:<5} медиана={statistics.median(timings):.2f} мс "
+                        f"макс={max(timings):.2f} мс"
+                    )
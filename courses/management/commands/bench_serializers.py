@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from courses.fast_serializers import RowSerializer
+from courses.models import Course, Lesson
+from courses.serializers import LessonSerializer
+
+
+class Command(BaseCommand):
+    help = "Сравнивает скорость LessonSerializer и RowSerializer (строк в секунду)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=10000)
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        # Данные создаются внутри транзакции и откатываются в конце.
+        with transaction.atomic():
+            course = Course.objects.create(title="bench")
+            Lesson.objects.bulk_create(
+                Lesson(title=f"Урок {i}", description="Описание " * 20, course=course)
+                for i in range(options["rows"])
+            )
+            queryset = Lesson.objects.filter(course=course).order_by("created_at", "id")
+            context = {"request": Request(RequestFactory().get("/courses/lessons/"))}
+            row_serializer = RowSerializer.compile(LessonSerializer(context=context))
+
+            variants = {
+                "ModelSerializer": (
+                    lambda: list(queryset.all()),
+                    lambda rows: LessonSerializer(rows, many=True, context=context).data,
+                ),
+                "RowSerializer": (
+                    lambda: list(queryset.values(*row_serializer.values_columns())),
+                    row_serializer.serialize,
+                ),
+            }
+            renderer = JSONRenderer()
+            outputs = {}
+            for name, (fetch, serialize) in variants.items():
+                fetch_time = serialize_time = None
+                for _ in range(options["repeat"]):
+                    started = time.perf_counter()
+                    rows = fetch()
+                    fetched = time.perf_counter()
+                    data = serialize(rows)
+                    finished = time.perf_counter()
+                    fetch_time = min(fetch_time or fetched - started, fetched - started)
+                    serialize_time = min(serialize_time or finished - fetched, finished - fetched)
+                outputs[name] = renderer.render(data)
+                self.stdout.write(
+                    f"{name:<16} выборка {fetch_time * 1000:>8.1f} мс   "
+                    f"сериализация {serialize_time * 1000:>8.1f} мс "
+                    f"({options['rows'] / serialize_time:>10,.0f} строк/с)"
+                )
+
+            identical = outputs["ModelSerializer"] == outputs["RowSerializer"]
+            self.stdout.write(f"JSON совпадает байт в байт: {'да' if identical else 'НЕТ'}")
+            transaction.set_rollback(True)
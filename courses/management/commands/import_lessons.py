@@ -0,0 +1,36 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.importing import FORMATS, LessonImporter, guess_format, read_records
+
+
+class Command(BaseCommand):
+    help = "Импортирует уроки из файла NDJSON или CSV пачками через bulk_create"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Путь к файлу (.ndjson, .jsonl или .csv)")
+        parser.add_argument("--format", choices=FORMATS, help="Формат файла, по умолчанию по расширению")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--max-errors", type=int, default=100, help="Сколько ошибок выводить в отчёте")
+
+    def handle(self, *args, **options):
+        file_format = options["format"] or guess_format(options["path"])
+        importer = LessonImporter(batch_size=options["batch_size"], max_errors=options["max_errors"])
+        started = time.perf_counter()
+        try:
+            with open(options["path"], "rb") as file:
+                report = importer.run(read_records(file, file_format))
+        except OSError as exc:
+            raise CommandError(exc)
+        elapsed = time.perf_counter() - started
+
+        for error in report["errors"]:
+            self.stderr.write(f"строка {error['line']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Строк {report['lines']}, создано {report['created']}, ошибок {report['error_count']} "
+                f"за {elapsed:.2f} с ({round(report['lines'] / elapsed) if elapsed else 0} строк/с)"
+            )
+        )
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from courses.changes import prune_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет записи об удалении старше CHANGE_FEED_RETENTION_DAYS; "
+        "клиенты с более старым курсором получают 410 и загружают каталог заново"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        pruned = prune_tombstones(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Удалено записей: {pruned} (старше {settings.CHANGE_FEED['RETENTION_DAYS']} дн.)"
+            )
+        )
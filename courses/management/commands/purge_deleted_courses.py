@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.deletion import purge_course
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        "Дочищает курсы, помеченные удалёнными: уроки удаляются пачками "
+        "(например, если фоновое удаление прервалось вместе с процессом). "
+        "С --loop работает постоянно и подбирает такие курсы сам"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, help="Уроков в одной транзакции")
+        parser.add_argument("--loop", action="store_true", help="Не завершаться, периодически искать курсы")
+        parser.add_argument("--interval", type=float, default=60.0, help="Пауза между поисками, секунд")
+
+    def handle(self, *args, **options):
+        purged = 0
+        try:
+            while True:
+                purged += self.purge(options["chunk_size"])
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Удалено курсов: {purged}"))
+
+    def purge(self, chunk_size):
+        purged = 0
+        # Курсы, которые удаляет фоновый поток веб-процесса, purge_course пропустит сам (блокировка строки).
+        for course_id in Course.objects.filter(deleted_at__isnull=False).values_list("pk", flat=True):
+            self.stdout.write(f"Курс {course_id}")
+            purge_course(
+                course_id,
+                chunk_size=chunk_size,
+                progress=lambda deleted, total: self.stdout.write(f"  удалено {deleted} из {total}"),
+            )
+            purged += not Course.objects.filter(pk=course_id).exists()
+        return purged
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from courses.cache import bump_version
+from courses.counters import lessons_count_drift, reconcile_lessons_count
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = "Находит и исправляет расхождения Course.lessons_count с фактическим числом уроков"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Только показать расхождения")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        drift = list(lessons_count_drift().values_list("pk", "lessons_count", "actual"))
+        for pk, stored, actual in drift[:50]:
+            self.stdout.write(f"Курс {pk}: сохранено {stored}, фактически {actual}")
+        if len(drift) > 50:
+            self.stdout.write(f"... и ещё {len(drift) - 50}")
+
+        if options["dry_run"] or not drift:
+            self.stdout.write(self.style.SUCCESS(f"Расхождений: {len(drift)}"))
+            return
+
+        fixed = 0
+        batch_size = options["batch_size"]
+        for start in range(0, len(drift), batch_size):
+            fixed += reconcile_lessons_count([pk for pk, _, _ in drift[start : start + batch_size]])
+        bump_version(Course)
+        self.stdout.write(self.style.SUCCESS(f"Исправлено курсов: {fixed}"))
@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from courses.seeding import Seeder
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет БД синтетическими курсами, уроками и пользователями: "
+        "COPY на PostgreSQL, bulk_create на остальных СУБД"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=1000)
+        parser.add_argument("--lessons-per-course", type=int, default=20)
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0, help="Seed генератора для воспроизводимых данных")
+        parser.add_argument(
+            "--batch-size", type=int, default=50000, help="Строк в одной пачке COPY/bulk_create"
+        )
+        parser.add_argument(
+            "--password", default="seed-password-1", help="Пароль всех создаваемых пользователей"
+        )
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        seeder = Seeder(seed=options["seed"], batch_size=options["batch_size"], using=options["database"])
+        if (
+            options["users"]
+            and User.objects.using(seeder.using).filter(email__startswith=f"seed{seeder.seed}-").exists()
+        ):
+            raise CommandError(f"Пользователи с seed={seeder.seed} уже созданы, укажите другой --seed")
+
+        started = time.perf_counter()
+        if options["users"]:
+            seeder.seed_users(options["users"], options["password"])
+        if options["courses"]:
+            course_ids = seeder.seed_courses(options["courses"])
+            if options["lessons_per_course"]:
+                seeder.seed_lessons(course_ids, options["lessons_per_course"])
+        elapsed = time.perf_counter() - started
+
+        total = 0
+        for label, stats in seeder.stats.items():
+            total += stats["rows"]
+            self.stdout.write(
+                f"{label:<14} {stats['method']:<11} строк={stats['rows']:<9} "
+                f"{stats['seconds']:.2f} с  {stats['rows_per_second'] or 0} строк/с"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Всего {total} строк за {elapsed:.2f} с ({round(total / elapsed) if elapsed else 0} строк/с)"
+            )
+        )
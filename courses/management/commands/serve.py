@@ -0,0 +1,95 @@
+import gc
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import get_internal_wsgi_application
+
+from config.prefork import PreforkServer, listen_socket, memory_usage, warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Prefork-сервер: приложение загружается и прогревается один раз в родителе, "
+        "воркеры получают его через fork() и делят память copy-on-write"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="127.0.0.1:8000", help="host:port")
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+        parser.add_argument("--backlog", type=int, default=2048)
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=0,
+            help="Перезапускать воркер после стольких запросов (0 — никогда)",
+        )
+        parser.add_argument("--max-requests-jitter", type=int, default=0)
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30,
+            help="Таймаут чтения и записи соединения, секунд",
+        )
+        parser.add_argument("--graceful-timeout", type=float, default=30)
+        parser.add_argument(
+            "--stats-interval",
+            type=float,
+            default=60,
+            help="Как часто писать RSS/PSS воркеров в лог, секунд (0 — только при старте)",
+        )
+        parser.add_argument(
+            "--no-freeze",
+            action="store_false",
+            dest="freeze",
+            help="Не замораживать кучу GC перед fork() (для сравнения памяти)",
+        )
+
+    def handle(self, *args, **options):
+        host, _, port = options["bind"].rpartition(":")
+        if not host or not port.isdigit():
+            raise CommandError("--bind задаётся как host:port")
+        if options["workers"] < 1:
+            raise CommandError("--workers должен быть не меньше 1")
+
+        if options["workers"] > 1 and isinstance(caches[settings.CATALOGUE_CACHE_ALIAS], LocMemCache):
+            # Версии каталога и сбросы кэша токенов не дошли бы до соседних воркеров.
+            self.stderr.write(
+                self.style.WARNING(
+                    "Кэш catalogue — LocMemCache у каждого воркера свой: задайте общий CATALOGUE_CACHE_BACKEND"
+                )
+            )
+
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("[%(asctime)s] [%(process)d] %(levelname)s %(message)s"))
+        logger = logging.getLogger("config.prefork")
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+        if options["freeze"]:
+            # До fork() сборщик не запускается, чтобы не оставлять в общих
+            # страницах «дыр» от освобождённых объектов.
+            gc.disable()
+        application = get_internal_wsgi_application()
+        stats = warm_up()
+        usage = memory_usage(os.getpid())
+        self.stdout.write(
+            f"Приложение прогрето за {stats['seconds']:.2f} с (сериализаторов {stats['serializers']})"
+            + (f", RSS родителя {usage['rss'] / 1024:.1f} МиБ" if usage else "")
+        )
+
+        server = PreforkServer(
+            listen_socket(host.strip("[]"), int(port), options["backlog"]),
+            application,
+            workers=options["workers"],
+            max_requests=options["max_requests"],
+            max_requests_jitter=options["max_requests_jitter"],
+            timeout=options["timeout"],
+            graceful_timeout=options["graceful_timeout"],
+            stats_interval=options["stats_interval"],
+            freeze=options["freeze"],
+        )
+        server.run()
@@ -0,0 +1,149 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+MARKER = "--- first request ---"
+
+# Выполняется в отдельном процессе с -X importtime: импорт точки входа,
+# затем первый запрос через WSGI/ASGI без сервера.
+PROBE = f"""
+import asyncio, io, json, sys, time
+
+module, url = sys.argv[1], sys.argv[2]
+path, _, query = url.partition("?")
+started = time.perf_counter()
+application = __import__(module, fromlist=["application"]).application
+loaded = time.perf_counter()
+print({MARKER!r}, file=sys.stderr, flush=True)
+
+if module.endswith("asgi"):
+    messages = []
+
+    async def receive():
+        return {{"type": "http.request", "body": b"", "more_body": False}}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application({{
+        "type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": query.encode(),
+        "headers": [(b"host", b"localhost")], "server": ("localhost", 80), "client": ("127.0.0.1", 0),
+    }}, receive, send))
+    status = messages[0]["status"]
+else:
+    from wsgiref.util import setup_testing_defaults
+
+    environ = {{"PATH_INFO": path, "QUERY_STRING": query, "wsgi.errors": io.StringIO()}}
+    setup_testing_defaults(environ)
+    statuses = []
+    b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+    status = int(statuses[0].split()[0])
+done = time.perf_counter()
+
+print(json.dumps({{
+    "import_ms": (loaded - started) * 1000,
+    "first_request_ms": (done - loaded) * 1000,
+    "status": status,
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Разбирает вывод -X importtime на фазы «импорт» и «первый запрос»."""
+    phases = {"import": [], "first_request": []}
+    phase = "import"
+    for line in stderr.splitlines():
+        if line == MARKER:
+            phase = "first_request"
+            continue
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        phases[phase].append((name.strip(), int(self_us), int(cumulative_us)))
+    return phases
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет холодный старт: время импорта по модулям (-X importtime) для "
+        "config.wsgi/config.asgi и время до первого ответа, в обычном и ленивом режиме"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="config.wsgi", choices=["config.wsgi", "config.asgi"])
+        parser.add_argument("--path", default="/courses/?page_size=1", help="URL первого запроса")
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--top", type=int, default=20, help="Сколько самых тяжёлых модулей показать")
+        parser.add_argument(
+            "--compare-lazy",
+            action="store_true",
+            help="Сравнить с DJANGO_LAZY_STARTUP=1",
+        )
+        parser.add_argument("--json", action="store_true", help="Вывести итог в JSON")
+
+    def handle(self, *args, **options):
+        modes = (
+            {"eager": "0", "lazy": "1"}
+            if options["compare_lazy"]
+            else {"current": "1" if settings.LAZY_STARTUP else "0"}
+        )
+        summary = {}
+        for mode, lazy in modes.items():
+            runs = [self.probe(options["module"], options["path"], lazy) for _ in range(options["repeat"])]
+            summary[mode] = {
+                key: round(statistics.median(run[key] for run in runs), 2)
+                for key in ("process_ms", "import_ms", "first_request_ms")
+            }
+            summary[mode]["status"] = runs[-1]["status"]
+            if not options["json"]:
+                self.report(mode, summary[mode], runs[-1]["phases"], options["top"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+        elif options["compare_lazy"]:
+            eager, lazy = summary["eager"], summary["lazy"]
+            for key in ("import_ms", "first_request_ms", "process_ms"):
+                self.stdout.write(
+                    f"{key:<18} {eager[key]:>9.1f} -> {lazy[key]:>9.1f} мс ({lazy[key] - eager[key]:+.1f})"
+                )
+
+    def probe(self, module, path, lazy):
+        env = {**os.environ, "DJANGO_LAZY_STARTUP": lazy, "PYTHONDONTWRITEBYTECODE": "1"}
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", PROBE, module, path],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        if result.returncode:
+            raise CommandError(
+                result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "Процесс упал"
+            )
+        data = json.loads(result.stdout.strip().splitlines()[-1])
+        return {**data, "process_ms": elapsed, "phases": parse_importtime(result.stderr)}
+
+    def report(self, mode, summary, phases, top):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Режим {mode}: {summary}"))
+        for phase, rows in phases.items():
+            if not rows:
+                continue
+            self.stdout.write(f"  {phase}: {len(rows)} модулей, {sum(row[1] for row in rows) / 1000:.1f} мс")
+            packages = defaultdict(int)
+            for name, self_us, _ in rows:
+                packages[name.split(".")[0]] += self_us
+            for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:10]:
+                self.stdout.write(f"    {package:<40} {self_us / 1000:8.1f} мс")
+            self.stdout.write("    самые тяжёлые модули (cumulative / self):")
+            for name, self_us, cumulative_us in sorted(rows, key=lambda row: -row[2])[:top]:
+                self.stdout.write(f"      {name:<60} {cumulative_us / 1000:8.1f} {self_us / 1000:8.1f} мс")
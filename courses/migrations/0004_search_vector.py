@@ -0,0 +1,100 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:19
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+SEARCH_CONFIG = "simple"
+
+TABLES = {
+    "courses_course": "course_search_vector_idx",
+    "courses_lesson": "lesson_search_vector_idx",
+}
+
+VECTOR_SQL = (
+    "setweight(to_tsvector('{config}', coalesce({row}title, '')), 'A') || "
+    "setweight(to_tsvector('{config}', coalesce({row}description, '')), 'B')"
+)
+
+
+def create_search_triggers(apps, schema_editor):
+    # GIN-индекс и триггер есть только в PostgreSQL; на SQLite колонка
+    # остаётся пустой, а поиск идёт через icontains (courses.search).
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, index in TABLES.items():
+        vector = VECTOR_SQL.format(config=SEARCH_CONFIG, row="NEW.")
+        schema_editor.execute(f"""
+            CREATE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {vector};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+            """)
+        schema_editor.execute(
+            f"CREATE TRIGGER {table}_search_vector_trigger "
+            f"BEFORE INSERT OR UPDATE OF title, description ON {table} "
+            f"FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()"
+        )
+        schema_editor.execute(
+            f"UPDATE {table} SET search_vector = "
+            + VECTOR_SQL.format(config=SEARCH_CONFIG, row="")
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {index} ON {table} USING gin (search_vector)"
+        )
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, index in TABLES.items():
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index}")
+        schema_editor.execute(
+            f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}"
+        )
+        schema_editor.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0003_lesson_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="course",
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="course_search_vector_idx"
+                    ),
+                ),
+                migrations.AddIndex(
+                    model_name="lesson",
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="lesson_search_vector_idx"
+                    ),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_triggers, drop_search_triggers),
+            ],
+        ),
+    ]
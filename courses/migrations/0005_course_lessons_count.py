@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_lessons_count(apps, schema_editor):
+    Course = apps.get_model("courses", "Course")
+    Lesson = apps.get_model("courses", "Lesson")
+    counts = (
+        Lesson.objects.filter(course=OuterRef("pk"))
+        .order_by()
+        .values("course")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    Course.objects.update(lessons_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0004_search_vector"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="lessons_count",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="Количество уроков"
+            ),
+        ),
+        migrations.RunPython(fill_lessons_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0005_course_lessons_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="deleted_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Дата удаления"
+            ),
+        ),
+    ]
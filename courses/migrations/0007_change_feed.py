@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:52
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0006_course_deleted_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("course", "Курс"), ("lesson", "Урок")],
+                        max_length=10,
+                        verbose_name="Тип объекта",
+                    ),
+                ),
+                ("object_id", models.BigIntegerField(verbose_name="ID объекта")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="Дата удаления"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Запись об удалении",
+                "verbose_name_plural": "Записи об удалении",
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="course",
+            name="course_updated_at_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="lesson",
+            name="lesson_updated_at_idx",
+        ),
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                fields=["updated_at", "id"], name="course_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["updated_at", "id"], name="lesson_updated_at_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                fields=["deleted_at", "id"], name="tombstone_deleted_at_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0007_change_feed"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="course",
+            index=models.Index(
+                condition=models.Q(("deleted_at__isnull", False)),
+                fields=["id"],
+                name="course_deleted_id_idx",
+            ),
+        ),
+    ]
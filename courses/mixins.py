@@ -0,0 +1,236 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from config.db_router import used_replicas
+from config.instrumentation import timed
+from courses.cache import get_response_data, get_versions, response_key, set_response_data
+from courses.fast_serializers import RowSerializer
+from courses.filters import FullTextSearchFilter
+from courses.pagination import SearchResultsPagination
+from courses.renderers import CSVRenderer, NDJSONRenderer
+from courses.serializers import get_sparse_fieldset
+
+
+class CachedReadMixin:
+    """
+    Кэширует сериализованные данные list/retrieve. Ключ включает версии
+    моделей из cache_models, поэтому запись инвалидирует кэш сменой версии.
+
+    Промах читается с той БД, которую выберет роутер. Ответ не кладётся в кэш,
+    если версии сменились во время чтения или если он прочитан с реплики
+    меньше чем через REPLICA_STICKY_SECONDS после последней записи: отстающая
+    реплика могла ещё не получить её, и старые строки жили бы под новой
+    версией весь таймаут.
+    """
+
+    cache_models = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        versions = get_versions(self.cache_models)
+        key = response_key(request, versions)
+        data = get_response_data(key)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            if self.is_cacheable(versions):
+                set_response_data(key, response.data)
+            response["X-Cache"] = "MISS"
+        return response
+
+    def is_cacheable(self, versions):
+        if get_versions(self.cache_models) != versions:
+            return False
+        if not used_replicas():
+            return True
+        # Версия — время последней записи в наносекундах (courses.cache.bump_version).
+        written = [int(version) for version in versions.split(":") if version.isdigit()]
+        if not written:
+            return False
+        return time.time_ns() - max(written) >= settings.REPLICA_ROUTING["STICKY_SECONDS"] * 1e9
+
+
+class ConditionalReadMixin:
+    """
+    ETag и Last-Modified для list/retrieve без сериализации строк.
+
+    Список: ETag из версий cache_models (courses.cache), которые меняются при
+    любой записи, включая удаления, — без запросов к БД, сколько бы строк ни
+    было в таблице. Last-Modified у списка нет.
+    Один объект: агрегат MAX(updated_at) по его строке (и урокам для outline).
+    """
+
+    def list(self, request, *args, **kwargs):
+        validators = {"versions": get_versions(self.cache_models)}
+        return self.conditional_response(validators, None, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        aggregates = self.get_validator_aggregates(queryset)
+        if aggregates["last_modified"] is None:
+            return super().retrieve(request, *args, **kwargs)
+        last_modified = max(
+            value for key, value in aggregates.items() if key.endswith("last_modified") and value
+        )
+        return self.conditional_response(
+            aggregates, last_modified, super().retrieve, request, *args, **kwargs
+        )
+
+    def get_validator_aggregates(self, queryset):
+        return queryset.aggregate(last_modified=Max("updated_at"), count=Count("pk"))
+
+    def conditional_response(self, validators, last_modified, handler, request, *args, **kwargs):
+        source = "|".join(
+            [request.build_absolute_uri(), request.accepted_renderer.format]
+            + [str(validators[key]) for key in sorted(validators)]
+        )
+        etag = quote_etag(hashlib.sha1(source.encode()).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+class SearchMixin:
+    """?search= по title/description; при поиске выдача идёт по рангу."""
+
+    filter_backends = [FullTextSearchFilter]
+
+    @property
+    def pagination_class(self):
+        if FullTextSearchFilter.get_search_query(self.request):
+            return SearchResultsPagination
+        return api_settings.DEFAULT_PAGINATION_CLASS
+
+
+class FieldProjectionMixin:
+    """
+    При ?fields= / ?omit= загружает через .only() только колонки, нужные
+    оставшимся полям сериализатора, чтобы лишние столбцы не читались из БД.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if get_sparse_fieldset(self.request) == (None, None):
+            return queryset
+
+        model_fields = {
+            field.name for field in queryset.model._meta.concrete_fields if field.name != "search_vector"
+        }
+        columns = {"created_at"}
+        for field in self.get_serializer().fields.values():
+            name = field.source.split(".")[0]
+            if name in model_fields:
+                columns.add(name)
+        return queryset.only(*columns)
+
+
+class FastListMixin:
+    """
+    list() через RowSerializer: строки берутся из values() и превращаются
+    в словари заранее подобранными конвертерами. Если сериализатор содержит
+    неподдерживаемые поля (например, вложенные уроки outline), используется
+    обычный путь.
+    """
+
+    def list(self, request, *args, **kwargs):
+        row_serializer = RowSerializer.compile(self.get_serializer())
+        if row_serializer is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = getattr(self.paginator, "ordering", ())
+        rows = queryset.values(*row_serializer.values_columns(ordering))
+        page = self.paginate_queryset(rows)
+        with timed("serialize"):
+            data = row_serializer.serialize(page if page is not None else rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+
+class StreamingExportMixin:
+    """
+    Потоковая выгрузка в NDJSON/CSV: строки читаются серверным курсором через
+    iterator(chunk_size=...) и отдаются StreamingHttpResponse по мере чтения,
+    поэтому память не растёт с размером таблицы.
+    """
+
+    export_renderer_classes = [NDJSONRenderer, CSVRenderer]
+    export_chunk_size = 2000
+    export_buffer_size = 64 * 1024
+    export_filename = "export"
+
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if not queryset.ordered:
+            queryset = queryset.order_by("created_at", "id")
+
+        serializer = self.get_serializer()
+        row_serializer = RowSerializer.compile(serializer)
+        if row_serializer is not None:
+            keys = row_serializer.keys
+            rows = queryset.values(*row_serializer.values_columns()).iterator(
+                chunk_size=self.export_chunk_size
+            )
+            items = row_serializer.iter_serialize(rows)
+        else:
+            keys = [name for name, field in serializer.fields.items() if not field.write_only]
+            items = map(serializer.to_representation, queryset.iterator(chunk_size=self.export_chunk_size))
+
+        renderer = request.accepted_renderer
+        content = self.buffered(renderer.stream(keys, items))
+        if isinstance(request._request, ASGIRequest):
+            content = _aiterate(content)
+        response = StreamingHttpResponse(
+            content,
+            content_type=f"{renderer.media_type}; charset={renderer.charset}",
+        )
+        response["Content-Disposition"] = f'attachment; filename="{self.export_filename}.{renderer.format}"'
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def buffered(self, chunks):
+        """Склеивает строки в блоки, чтобы не писать в сокет по одной записи."""
+        buffer, size = [], 0
+        for chunk in chunks:
+            buffer.append(chunk)
+            size += len(chunk)
+            if size >= self.export_buffer_size:
+                yield b"".join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b"".join(buffer)
+
+
+async def _aiterate(iterator):
+    """
+    Под ASGI синхронный итератор StreamingHttpResponse был бы прочитан целиком
+    в память; здесь блоки читаются по одному в потоке для синхронного кода.
+    """
+    done = object()
+    while (chunk := await sync_to_async(next)(iterator, done)) is not done:
+        yield chunk
@@ -1,4 +1,34 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+
+
+class SearchVectorDeferredManager(models.Manager):
+    """
+    Не загружает search_vector: колонку заполняет триггер БД (миграция
+    0004_search_vector), а читает только SQL поиска (courses.search).
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().defer("search_vector")
+
+
+class CourseQuerySet(models.QuerySet):
+    def alive(self):
+        """Курсы, не помеченные удалёнными."""
+        return self.filter(deleted_at__isnull=True)
+
+
+class LessonQuerySet(models.QuerySet):
+    def alive(self):
+        """
+        Уроки без курса или из курсов, не помеченных удалёнными. Помеченные
+        курсы вскоре удаляются фоном, поэтому их список мал: NOT IN по нему
+        проверяется на каждой строке обычного скана индекса (created_at, id)
+        без JOIN с курсами и OR. exclude() сохраняет уроки с course_id NULL.
+        """
+        return self.exclude(course__in=Course.objects.filter(deleted_at__isnull=False).values("pk"))
 
 
 class Course(models.Model):
@@ -24,10 +54,36 @@ class Course(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Заполняется триггером PostgreSQL из title и description (см. миграцию 0004).
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Поддерживается через F() при изменении уроков (см. courses/counters.py).
+    lessons_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Количество уроков",
+    )
+    # Курс скрыт сразу, а уроки удаляются в фоне пачками (см. courses/deletion.py).
+    deleted_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Дата удаления",
+    )
+
+    objects = SearchVectorDeferredManager.from_queryset(CourseQuerySet)()
 
     class Meta:
         verbose_name = "Курс"
         verbose_name_plural = "Курсы"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="course_created_at_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="course_updated_at_id_idx"),
+            GinIndex(fields=["search_vector"], name="course_search_vector_idx"),
+            # Помеченные удалёнными курсы для LessonQuerySet.alive().
+            models.Index(
+                fields=["id"], condition=models.Q(deleted_at__isnull=False), name="course_deleted_id_idx"
+            ),
+        ]
 
 
 class Lesson(models.Model):
@@ -65,7 +121,39 @@ class Lesson(models.Model):
         null=True,
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Заполняется триггером PostgreSQL из title и description (см. миграцию 0004).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = SearchVectorDeferredManager.from_queryset(LessonQuerySet)()
 
     class Meta:
         verbose_name = "Урок"
         verbose_name_plural = "Уроки"
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="lesson_created_at_id_idx"),
+            models.Index(fields=["updated_at", "id"], name="lesson_updated_at_id_idx"),
+            GinIndex(fields=["search_vector"], name="lesson_search_vector_idx"),
+        ]
+
+
+class Tombstone(models.Model):
+    """Запись об удалении курса или урока для ленты изменений (см. courses/changes.py)."""
+
+    COURSE = "course"
+    LESSON = "lesson"
+    KIND_CHOICES = [
+        (COURSE, "Курс"),
+        (LESSON, "Урок"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, verbose_name="Тип объекта")
+    object_id = models.BigIntegerField(verbose_name="ID объекта")
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Дата удаления")
+
+    class Meta:
+        verbose_name = "Запись об удалении"
+        verbose_name_plural = "Записи об удалении"
+        indexes = [
+            models.Index(fields=["deleted_at", "id"], name="tombstone_deleted_at_id_idx"),
+        ]
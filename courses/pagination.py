@@ -0,0 +1,30 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация DRF: страница выбирается условием WHERE created_at >
+    <курсор> по индексу (created_at, id), поэтому стоимость не зависит от
+    глубины. В курсор попадает только created_at (первое поле ordering); id
+    лишь упорядочивает строки с одинаковым created_at, а такие строки на
+    границе страницы пропускаются смещением в курсоре (OFFSET), а не
+    сравнением по id.
+    """
+
+    ordering = ("created_at", "id")
+    page_size_query_param = "page_size"
+
+    @property
+    def max_page_size(self):
+        return settings.REST_FRAMEWORK.get("MAX_PAGE_SIZE")
+
+
+class SearchResultsPagination(PageNumberPagination):
+    """Результаты поиска упорядочены по рангу, поэтому листаются по номеру страницы."""
+
+    page_size_query_param = "page_size"
+
+    @property
+    def max_page_size(self):
+        return settings.REST_FRAMEWORK.get("MAX_PAGE_SIZE")
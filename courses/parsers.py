@@ -0,0 +1,16 @@
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from courses import json_backend
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson (см. courses.json_backend); без orjson — парсер DRF."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not json_backend.fast:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return json_backend.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
@@ -0,0 +1,75 @@
+import csv
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from courses import json_backend
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson (см. courses.json_backend); при запросе отступов
+    (Browsable API, ?indent) и без orjson работает стандартный рендерер DRF.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not json_backend.fast or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return json_backend.dumps(data)
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Рендерер построчной выдачи: stream() отдаёт байты по одной записи,
+    render() используется для обычных ответов (например, ошибок).
+    """
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        keys = list(items[0]) if items and isinstance(items[0], dict) else []
+        return b"".join(self.stream(keys, items))
+
+    def stream(self, keys, items):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(StreamingRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+    def stream(self, keys, items):
+        for item in items:
+            yield json_backend.dumps(item) + b"\n"
+
+
+class _Line:
+    """Файлоподобный объект для csv.writer: write() возвращает готовую строку."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(StreamingRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+    def stream(self, keys, items):
+        writer = csv.writer(_Line())
+        yield writer.writerow(keys).encode()
+        for item in items:
+            if not isinstance(item, dict):
+                item = {keys[0] if keys else "detail": item}
+            yield writer.writerow(self.cell(item.get(key)) for key in keys).encode()
+
+    @staticmethod
+    def cell(value):
+        if value is None:
+            return ""
+        if isinstance(value, (dict, list)):
+            return json_backend.dumps(value).decode()
+        return value
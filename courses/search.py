@@ -0,0 +1,31 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+# Должна совпадать с конфигурацией в триггере миграции 0004_search_vector.
+SEARCH_CONFIG = "simple"
+
+
+def search(queryset, query):
+    """
+    Полнотекстовый поиск по title/description с ранжированием.
+    На PostgreSQL — по search_vector (GIN), на остальных СУБД — icontains.
+    """
+    if connections[queryset.db].vendor == "postgresql":
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        queryset = queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F("search_vector"), search_query)
+        )
+    else:
+        queryset = queryset.filter(Q(title__icontains=query) | Q(description__icontains=query)).annotate(
+            search_rank=Case(
+                When(title__icontains=query, then=Value(1.0)),
+                default=Value(0.5),
+                output_field=FloatField(),
+            )
+        )
+    return queryset.order_by("-search_rank", "id")
+
+
+def icontains_scan(queryset, query):
+    return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query)).order_by("id")
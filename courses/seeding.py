@@ -0,0 +1,190 @@
+import csv
+import datetime
+import io
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+
+from courses.cache import bump_version
+from courses.counters import apply_lessons_count
+from courses.models import Course, Lesson
+from users.models import User
+
+WORDS = (
+    "python django rest api курс урок данные модель запрос ответ сервер клиент база индекс "
+    "транзакция кэш очередь поток процесс тест сериализатор маршрут шаблон форма миграция "
+    "поиск страница фильтр запись чтение нагрузка профиль метрика задача пример практика"
+).split()
+CITIES = ("Москва", "Казань", "Новосибирск", "Екатеринбург", "Самара", "Пермь", None)
+BASE_TIME = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def supports_copy(connection):
+    """COPY доступен только на PostgreSQL с драйвером psycopg2."""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        return hasattr(cursor.cursor, "copy_expert")
+
+
+def copy_rows(connection, model, columns, rows, force_not_null=()):
+    """Загружает кортежи значений в таблицу модели одним COPY FROM STDIN."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(
+            "" if value is None else ("t" if value is True else "f" if value is False else value)
+            for value in row
+        )
+    buffer.seek(0)
+    quote = connection.ops.quote_name
+    options = "FORMAT csv"
+    if force_not_null:
+        options += f", FORCE_NOT_NULL ({', '.join(map(quote, force_not_null))})"
+    with connection.cursor() as cursor:
+        cursor.cursor.copy_expert(
+            f"COPY {quote(model._meta.db_table)} ({', '.join(map(quote, columns))}) "
+            f"FROM STDIN WITH ({options})",
+            buffer,
+        )
+
+
+class Seeder:
+    """
+    Генератор синтетических курсов, уроков и пользователей.
+
+    На PostgreSQL строки пачками передаются через COPY FROM STDIN, на
+    остальных СУБД — через bulk_create. Содержимое детерминировано seed.
+    """
+
+    def __init__(self, seed=0, batch_size=50000, using="default"):
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.using = using
+        self.connection = connections[using]
+        self.stats = {}
+
+    @cached_property
+    def use_copy(self):
+        return supports_copy(self.connection)
+
+    def words(self, low, high):
+        return " ".join(self.random.choices(WORDS, k=self.random.randint(low, high)))
+
+    def timestamp(self, index):
+        return BASE_TIME + datetime.timedelta(seconds=index * 7 + self.random.randint(0, 6))
+
+    def seed_users(self, count, password):
+        password_hash = make_password(password)
+        columns = (
+            "email",
+            "password",
+            "is_superuser",
+            "is_staff",
+            "is_active",
+            "first_name",
+            "last_name",
+            "city",
+            "date_joined",
+        )
+
+        def rows():
+            for index in range(count):
+                yield (
+                    f"seed{self.seed}-user{index}@example.com",
+                    password_hash,
+                    False,
+                    False,
+                    True,
+                    self.words(1, 1).capitalize(),
+                    self.words(1, 1).capitalize(),
+                    self.random.choice(CITIES),
+                    self.timestamp(index),
+                )
+
+        self.insert(User, columns, rows(), count, force_not_null=("first_name", "last_name"))
+
+    def seed_courses(self, count):
+        # У lessons_count нет DEFAULT в БД (Django снимает его после AddField),
+        # поэтому COPY передаёт 0 явно; реальные значения ставит seed_lessons().
+        columns = ("id", "title", "description", "lessons_count", "created_at", "updated_at")
+        ids = self.reserve_ids(Course, count)
+
+        def rows():
+            for index, pk in enumerate(ids):
+                created_at = self.timestamp(index)
+                yield pk, self.words(2, 5).capitalize(), self.words(20, 80), 0, created_at, created_at
+
+        self.insert(Course, columns, rows(), count)
+        return ids
+
+    def seed_lessons(self, course_ids, per_course):
+        columns = ("title", "course_id", "description", "video_url", "created_at", "updated_at")
+        count = len(course_ids) * per_course
+
+        def rows():
+            index = 0
+            for course_id in course_ids:
+                for number in range(per_course):
+                    created_at = self.timestamp(index)
+                    video = (
+                        f"https://video.example.com/{course_id}/{number}"
+                        if self.random.random() < 0.7
+                        else None
+                    )
+                    yield (
+                        f"Урок {number + 1}. {self.words(2, 6)}",
+                        course_id,
+                        self.words(30, 150),
+                        video,
+                        created_at,
+                        created_at,
+                    )
+                    index += 1
+
+        self.insert(Lesson, columns, rows(), count)
+        with transaction.atomic(using=self.using):
+            apply_lessons_count(dict.fromkeys(course_ids, per_course), using=self.using)
+        transaction.on_commit(lambda: bump_version(Lesson, Course), using=self.using)
+
+    def reserve_ids(self, model, count):
+        if self.connection.vendor != "postgresql":
+            last = model.objects.using(self.using).order_by("-pk").values_list("pk", flat=True).first() or 0
+            return list(range(last + 1, last + 1 + count))
+        table = model._meta.db_table
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [table, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def insert(self, model, columns, rows, count, force_not_null=()):
+        started = time.perf_counter()
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self.flush(model, columns, batch, force_not_null)
+                batch = []
+        if batch:
+            self.flush(model, columns, batch, force_not_null)
+        elapsed = time.perf_counter() - started
+        self.stats[model._meta.label] = {
+            "rows": count,
+            "seconds": round(elapsed, 3),
+            "rows_per_second": round(count / elapsed) if elapsed else None,
+            "method": "copy" if self.use_copy else "bulk_create",
+        }
+
+    def flush(self, model, columns, batch, force_not_null):
+        with transaction.atomic(using=self.using):
+            if self.use_copy:
+                copy_rows(self.connection, model, columns, batch, force_not_null)
+            else:
+                objects = [model(**dict(zip(columns, row))) for row in batch]
+                model.objects.using(self.using).bulk_create(objects, batch_size=1000)
@@ -1,15 +1,98 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
 
+from config.instrumentation import TimedListSerializer, TimedSerializerMixin
+from config.thumbnails import ThumbnailsField
 from courses.models import Course, Lesson
 
 
-class LessonSerializer(serializers.ModelSerializer):
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Если в context["preloaded"] переданы объекты модели (pk -> объект),
+    берёт их оттуда вместо отдельного запроса на каждую строку.
+    """
+
+    def to_internal_value(self, data):
+        model = self.queryset.model
+        preloaded = self.context.get("preloaded", {}).get(model)
+        if preloaded is None or isinstance(data, bool):
+            return super().to_internal_value(data)
+        try:
+            pk = model._meta.pk.to_python(data)
+        except DjangoValidationError:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in preloaded:
+            self.fail("does_not_exist", pk_value=data)
+        return preloaded[pk]
+
+
+def preload_courses(rows):
+    """Загружает одним запросом все курсы, на которые ссылаются строки уроков."""
+    course_ids = set()
+    for row in rows:
+        try:
+            course_ids.add(int(row["course"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return {Course: Course.objects.alive().in_bulk(course_ids)}
+
+
+def get_sparse_fieldset(request):
+    """Возвращает (fields, omit) из параметров ?fields= и ?omit= GET-запроса."""
+    if request is None or request.method != "GET":
+        return None, None
+    params = getattr(request, "query_params", request.GET)
+    fields, omit = (
+        {name.strip() for name in params[key].split(",") if name.strip()} if params.get(key) else None
+        for key in ("fields", "omit")
+    )
+    return fields, omit
+
+
+class SparseFieldsetMixin:
+    """Оставляет в выдаче только поля из ?fields= и убирает поля из ?omit=."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, omit = get_sparse_fieldset(self.context.get("request"))
+        for name in list(self.fields):
+            if (fields is not None and name not in fields) or (omit is not None and name in omit):
+                self.fields.pop(name)
+
+
+class LessonSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+    preview_thumbnails = ThumbnailsField(source="preview")
+
     class Meta:
         model = Lesson
-        fields = "__all__"
+        exclude = ("search_vector",)
+        extra_kwargs = {"course": {"queryset": Course.objects.alive()}}
+        list_serializer_class = TimedListSerializer
 
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(TimedSerializerMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    preview_thumbnails = ThumbnailsField(source="preview")
+
     class Meta:
         model = Course
-        fields = "__all__"
\ No newline at end of file
+        exclude = ("search_vector", "deleted_at")
+        list_serializer_class = TimedListSerializer
+
+
+class CourseOutlineSerializer(CourseSerializer):
+    lessons = LessonSerializer(many=True, read_only=True)
+
+
+class LessonBulkSerializer(serializers.Serializer):
+    create = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    update = serializers.ListField(child=serializers.DictField(), required=False, default=list)
+    delete = serializers.ListField(child=serializers.IntegerField(), required=False, default=list)
+
+    def validate_update(self, value):
+        for item in value:
+            try:
+                item["id"] = int(item["id"])
+            except (KeyError, TypeError, ValueError):
+                raise serializers.ValidationError("Для каждого обновляемого урока укажите числовой id")
+        return value
@@ -0,0 +1,72 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from config.thumbnails import register_thumbnails
+from courses.cache import bump_version
+from courses.changes import record_deletion
+from courses.counters import change_lessons_count
+from courses.models import Course, Lesson
+
+
+# Версию меняем после коммита: иначе параллельный читатель успеет
+# закэшировать старые данные уже под новой версией.
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course_cache(sender, **kwargs):
+    transaction.on_commit(partial(bump_version, Course))
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def invalidate_lesson_cache(sender, **kwargs):
+    # Уроки вложены в outline курса, поэтому сбрасываем и версию курсов.
+    transaction.on_commit(partial(bump_version, Lesson, Course))
+
+
+@receiver(post_init, sender=Lesson)
+def remember_lesson_course(sender, instance, **kwargs):
+    # Через __dict__, чтобы не загружать отложенное поле.
+    if "course_id" in instance.__dict__:
+        instance._loaded_course_id = instance.course_id
+
+
+@receiver(post_save, sender=Lesson)
+def count_saved_lesson(sender, instance, created, raw=False, **kwargs):
+    # Фикстуры (loaddata) приносят счётчик курса готовым.
+    if raw:
+        return
+    if created:
+        change_lessons_count({instance.course_id: 1})
+    elif "_loaded_course_id" in instance.__dict__ and instance._loaded_course_id != instance.course_id:
+        change_lessons_count({instance._loaded_course_id: -1, instance.course_id: 1})
+    instance._loaded_course_id = instance.course_id
+
+
+@receiver(post_delete, sender=Lesson)
+def count_deleted_lesson(sender, instance, origin=None, **kwargs):
+    # При удалении самого курса его счётчик обновлять незачем.
+    if instance.course_id is None or isinstance(origin, Course) or getattr(origin, "model", None) is Course:
+        return
+    change_lessons_count({instance.course_id: -1})
+
+
+@receiver(post_delete, sender=Lesson)
+def tombstone_deleted_lesson(sender, instance, origin=None, **kwargs):
+    # Удаление курса попадает в ленту изменений одной записью, без его уроков.
+    if isinstance(origin, Course) or getattr(origin, "model", None) is Course:
+        return
+    record_deletion(Lesson, [instance.pk])
+
+
+@receiver(post_delete, sender=Course)
+def tombstone_deleted_course(sender, instance, **kwargs):
+    # Помеченный курс записан в ленту ещё в mark_deleted().
+    if instance.deleted_at is None:
+        record_deletion(Course, [instance.pk])
+
+
+register_thumbnails(Course, "preview")
+register_thumbnails(Lesson, "preview")
@@ -1,3 +1,292 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APITestCase
+
+from courses.changes import encode_cursor
+from courses.counters import lessons_count_drift
+from courses.models import Course, Lesson
+from courses.renderers import FastJSONRenderer
+from courses.serializers import CourseSerializer, LessonSerializer
+
+
+class CatalogueTestCase(APITestCase):
+    """Каждый тест начинается с пустого кэша каталога, иначе ответы берутся из него без SQL."""
+
+    def setUp(self):
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+
+    @staticmethod
+    def create_courses(courses, lessons_per_course):
+        created = []
+        for number in range(courses):
+            course = Course.objects.create(title=f"Курс {number}", description="Описание")
+            for lesson_number in range(lessons_per_course):
+                Lesson.objects.create(title=f"Урок {number}.{lesson_number}", course=course)
+            created.append(course)
+        return created
+
+
+class OutlineQueriesTest(CatalogueTestCase):
+    """Outline отдаёт курсы с уроками за постоянное число запросов, сколько бы их ни было."""
+
+    def assert_outline_queries(self, courses, lessons_per_course):
+        created = self.create_courses(courses, lessons_per_course)
+        caches[settings.CATALOGUE_CACHE_ALIAS].clear()
+
+        # Курсы и один prefetch уроков для всей страницы.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("courses:courses-list"), {"expand": "lessons"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), courses)
+        for course in response.data["results"]:
+            self.assertEqual(len(course["lessons"]), lessons_per_course)
+            self.assertEqual(course["lessons_count"], lessons_per_course)
+
+        # Агрегат для ETag, сам курс и prefetch его уроков.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse("courses:courses-outline", args=[created[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["lessons"]), lessons_per_course)
+
+    def test_small_catalogue(self):
+        self.assert_outline_queries(courses=2, lessons_per_course=1)
+
+    def test_large_catalogue(self):
+        self.assert_outline_queries(courses=10, lessons_per_course=7)
+
+    def test_cached_outline_needs_no_queries(self):
+        self.create_courses(3, 2)
+        url = reverse("courses:courses-list")
+        self.client.get(url, {"expand": "lessons"})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"expand": "lessons"})
+        self.assertEqual(response["X-Cache"], "HIT")
+
+
+class FastListSerializationTest(CatalogueTestCase):
+    """Быстрый путь списков (RowSerializer) отдаёт те же байты, что и ModelSerializer."""
+
+    def setUp(self):
+        super().setUp()
+        course = Course.objects.create(title="Курс «Δ»", description="Описание\u2028с разделителем")
+        Course.objects.create(title="Без описания", preview="courses/preview/cover.png")
+        Lesson.objects.create(title="Урок", course=course, video_url="https://youtube.com/watch?v=1")
+        Lesson.objects.create(title="Урок без курса", preview="lessons/preview/frame.png", description="")
+
+    def assert_identical(self, url_name, serializer_class, queryset, params):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        context = {"request": Request(response.wsgi_request)}
+        expected = serializer_class(queryset.order_by("created_at", "id"), many=True, context=context).data
+        self.assertEqual(response.content, FastJSONRenderer().render({**response.data, "results": expected}))
+
+    def test_lessons(self):
+        for params in ({}, {"fields": "id,title,preview_thumbnails"}, {"omit": "description,course"}):
+            with self.subTest(params=params):
+                self.assert_identical("courses:lessons", LessonSerializer, Lesson.objects.alive(), params)
+
+    def test_courses(self):
+        for params in ({}, {"fields": "id,lessons_count,updated_at"}, {"omit": "preview_thumbnails"}):
+            with self.subTest(params=params):
+                self.assert_identical(
+                    "courses:courses-list", CourseSerializer, Course.objects.alive(), params
+                )
+
+
+class LessonsCountTest(CatalogueTestCase):
+    """Course.lessons_count совпадает с числом уроков после любых изменений через API."""
+
+    def setUp(self):
+        super().setUp()
+        self.first = Course.objects.create(title="Первый")
+        self.second = Course.objects.create(title="Второй")
+
+    def assert_counts(self, first, second):
+        self.first.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertEqual((self.first.lessons_count, self.second.lessons_count), (first, second))
+        self.assertFalse(lessons_count_drift().exists())
+
+    def test_create_move_delete(self):
+        response = self.client.post(
+            reverse("courses:lesson_create"), {"title": "Урок", "course": self.first.pk}
+        )
+        self.assertEqual(response.status_code, 201)
+        lesson_id = response.data["id"]
+        self.assert_counts(1, 0)
+
+        response = self.client.patch(
+            reverse("courses:lesson_update", args=[lesson_id]), {"course": self.second.pk}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_counts(0, 1)
+
+        # Изменение без переноса счётчики не трогает.
+        self.client.patch(
+            reverse("courses:lesson_update", args=[lesson_id]), {"title": "Новое"}, format="json"
+        )
+        self.assert_counts(0, 1)
+
+        response = self.client.delete(reverse("courses:lesson_delete", args=[lesson_id]))
+        self.assertEqual(response.status_code, 204)
+        self.assert_counts(0, 0)
+
+    def test_bulk(self):
+        moved = Lesson.objects.create(title="Переносимый", course=self.first)
+        removed = Lesson.objects.create(title="Удаляемый", course=self.first)
+        self.assert_counts(2, 0)
+
+        response = self.client.post(
+            reverse("courses:lesson_bulk"),
+            {
+                "create": [
+                    {"title": "Новый 1", "course": self.first.pk},
+                    {"title": "Новый 2", "course": self.second.pk},
+                    {"title": "Без курса"},
+                ],
+                "update": [{"id": moved.pk, "course": self.second.pk}],
+                "delete": [removed.pk],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_counts(1, 2)
+
+    def test_bulk_with_errors_changes_nothing(self):
+        response = self.client.post(
+            reverse("courses:lesson_bulk"),
+            {"create": [{"title": "Урок", "course": self.first.pk}, {"course": self.second.pk}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assert_counts(0, 0)
+
+    def test_import(self):
+        body = "\n".join(
+            [
+                f'{{"title": "Урок 1", "course": {self.first.pk}}}',
+                f'{{"title": "Урок 2", "course": {self.second.pk}}}',
+                f'{{"title": "Урок 3", "course": {self.second.pk}}}',
+                '{"course": 1}',
+                "не JSON",
+            ]
+        )
+        response = self.client.post(
+            reverse("courses:lesson_import"), body.encode(), content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data["created"], response.data["error_count"]), (3, 2))
+        self.assert_counts(1, 2)
+
+        body = f"title,course\nУрок 4,{self.first.pk}\n"
+        self.client.post(reverse("courses:lesson_import"), body.encode(), content_type="text/csv")
+        self.assert_counts(2, 2)
+
+    def test_delete_with_zero_counter(self):
+        lessons = [Lesson.objects.create(title=f"Урок {number}", course=self.first) for number in range(2)]
+        # Счётчик разошёлся с уроками: удаление не должно падать на CHECK lessons_count >= 0.
+        Course.objects.filter(pk=self.first.pk).update(lessons_count=0)
+
+        response = self.client.delete(reverse("courses:lesson_delete", args=[lessons[0].pk]))
+        self.assertEqual(response.status_code, 204)
+        response = self.client.post(
+            reverse("courses:lesson_bulk"), {"delete": [lessons[1].pk]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assert_counts(0, 0)
+
+    def test_reconcile(self):
+        Lesson.objects.create(title="Урок", course=self.first)
+        Course.objects.filter(pk=self.first.pk).update(lessons_count=5)
+        self.first.refresh_from_db()
+        stale_updated_at = self.first.updated_at
+
+        call_command("reconcile_lessons_count", stdout=StringIO())
+        self.assert_counts(1, 0)
+        # Иначе ETag курса и лента изменений не заметят исправления.
+        self.assertGreater(self.first.updated_at, stale_updated_at)
+
+
+# Без задержки безопасности строки, созданные в тесте, сразу попадают в ленту.
+@override_settings(CHANGE_FEED={**settings.CHANGE_FEED, "SAFETY_LAG_SECONDS": 0})
+class ChangeFeedTest(CatalogueTestCase):
+    def setUp(self):
+        super().setUp()
+        self.courses = self.create_courses(3, 2)
+        self.url = reverse("courses:changes")
+
+    def sync(self, cursor=None, limit=2):
+        """Листает ленту до has_more=False, возвращает собранные id и последний курсор."""
+        changes = {"courses": [], "lessons": [], "deleted_courses": [], "deleted_lessons": []}
+        pages = 0
+        while True:
+            params = {"limit": limit}
+            if cursor:
+                params["since"] = cursor
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            pages += 1
+            changes["courses"] += [course["id"] for course in response.data["courses"]]
+            changes["lessons"] += [lesson["id"] for lesson in response.data["lessons"]]
+            changes["deleted_courses"] += response.data["deleted"]["courses"]
+            changes["deleted_lessons"] += response.data["deleted"]["lessons"]
+            cursor = response.data["cursor"]
+            if not response.data["has_more"]:
+                return changes, cursor, pages
+
+    def test_full_sync_pages_through_everything_once(self):
+        changes, _, pages = self.sync(limit=2)
+        self.assertEqual(sorted(changes["courses"]), sorted(course.pk for course in self.courses))
+        self.assertEqual(sorted(changes["lessons"]), sorted(Lesson.objects.values_list("pk", flat=True)))
+        self.assertEqual(changes["deleted_courses"] + changes["deleted_lessons"], [])
+        # 6 уроков по 2 на страницу; полная страница всегда даёт has_more, поэтому страниц 4.
+        self.assertEqual(pages, 4)
+
+    def test_incremental_changes_and_tombstones(self):
+        _, cursor, _ = self.sync(limit=100)
+        changes, cursor, _ = self.sync(cursor)
+        self.assertEqual(
+            changes, {"courses": [], "lessons": [], "deleted_courses": [], "deleted_lessons": []}
+        )
+
+        kept, removed = Lesson.objects.filter(course=self.courses[0]).order_by("pk")
+        response = self.client.patch(
+            reverse("courses:lesson_update", args=[kept.pk]), {"title": "Изменён"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.client.delete(reverse("courses:lesson_delete", args=[removed.pk]))
+        response = self.client.delete(reverse("courses:courses-detail", args=[self.courses[1].pk]))
+        self.assertEqual(response.status_code, 204)
+
+        changes, _, _ = self.sync(cursor)
+        self.assertEqual(changes["lessons"], [kept.pk])
+        # Первый курс изменился вместе со счётчиком уроков.
+        self.assertEqual(changes["courses"], [self.courses[0].pk])
+        self.assertEqual(changes["deleted_lessons"], [removed.pk])
+        self.assertEqual(changes["deleted_courses"], [self.courses[1].pk])
+
+    def test_expired_cursor(self):
+        old = timezone.now() - datetime.timedelta(days=settings.CHANGE_FEED["RETENTION_DAYS"] + 1)
+        for positions in (
+            {"courses": (old, 0), "lessons": (old, 0), "deleted": (old, 0)},
+            {"courses": (old, 0)},
+        ):
+            with self.subTest(positions=list(positions)):
+                response = self.client.get(self.url, {"since": encode_cursor(positions)})
+                self.assertEqual(response.status_code, 410)
+
+    def test_invalid_cursor(self):
+        naive = datetime.datetime.now()
+        # Не base64, {"deleted": ["x", 0]} и время без часового пояса.
+        for cursor in ("не курсор", "eyJkZWxldGVkIjpbIngiLDBdfQ", encode_cursor({"deleted": (naive, 0)})):
+            with self.subTest(cursor=cursor):
+                response = self.client.get(self.url, {"since": cursor})
+                self.assertEqual(response.status_code, 400)
@@ -1,7 +1,8 @@
 from rest_framework.routers import SimpleRouter
 from django.urls import path
 from courses.views import CourseViewSet, LessonListAPIView, LessonCreateAPIView, \
-    LessonUpdateAPIView, LessonDestroyAPIView, LessonRetrieveAPIView
+    LessonUpdateAPIView, LessonDestroyAPIView, LessonRetrieveAPIView, CatalogueCacheStatsAPIView, LessonBulkAPIView, \
+    LessonExportAPIView, LessonImportAPIView, ChangeFeedAPIView
 from courses.apps import CoursesConfig
 
 app_name = CoursesConfig.name
@@ -12,8 +13,13 @@ router.register('', CourseViewSet, basename="courses")
 urlpatterns = [
     path("lessons/", LessonListAPIView.as_view(), name="lessons"),
     path("lessons/create/", LessonCreateAPIView.as_view(), name="lesson_create"),
+    path("lessons/bulk/", LessonBulkAPIView.as_view(), name="lesson_bulk"),
+    path("lessons/export/", LessonExportAPIView.as_view(), name="lesson_export"),
+    path("lessons/import/", LessonImportAPIView.as_view(), name="lesson_import"),
     path("lessons/<int:pk>/update/", LessonUpdateAPIView.as_view(), name="lesson_update"),
     path("lessons/<int:pk>/", LessonRetrieveAPIView.as_view(), name="lesson_retrieve"),
     path("lessons/<int:pk>/delete/", LessonDestroyAPIView.as_view(), name="lesson_delete"),
+    path("cache/stats/", CatalogueCacheStatsAPIView.as_view(), name="cache_stats"),
+    path("changes/", ChangeFeedAPIView.as_view(), name="changes"),
 ]
 urlpatterns += router.urls
\ No newline at end of file
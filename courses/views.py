@@ -1,35 +1,242 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Prefetch
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
-from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveAPIView, UpdateAPIView, DestroyAPIView
+from rest_framework.generics import GenericAPIView, CreateAPIView, ListAPIView, RetrieveAPIView, UpdateAPIView, \
+    DestroyAPIView
 
+from courses.cache import bump_version, get_stats
+from courses.changes import ExpiredCursor, InvalidCursor, batched_tombstones, changes_since
+from courses.counters import batched_lessons_count, change_lessons_count
+from courses.deletion import mark_deleted
+from courses.mixins import CachedReadMixin, ConditionalReadMixin, FastListMixin, FieldProjectionMixin, \
+    SearchMixin, StreamingExportMixin
 from courses.models import Course, Lesson
-from courses.serializers import CourseSerializer, LessonSerializer
+from courses.serializers import CourseSerializer, CourseOutlineSerializer, LessonSerializer, LessonBulkSerializer, \
+    preload_courses
 
 
-class CourseViewSet(ModelViewSet):
-    queryset = Course.objects.all()
+class CourseViewSet(FieldProjectionMixin, SearchMixin, ConditionalReadMixin, CachedReadMixin, FastListMixin,
+                    StreamingExportMixin, ModelViewSet):
+    queryset = Course.objects.alive()
     serializer_class = CourseSerializer
+    cache_models = (Course, Lesson)
+    export_filename = "courses"
+
+    def is_outline(self):
+        if self.action == "outline":
+            return True
+        return self.action == "list" and self.request.query_params.get("expand") == "lessons"
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.is_outline():
+            queryset = queryset.prefetch_related(
+                Prefetch("lessons", queryset=Lesson.objects.order_by("created_at", "id"))
+            )
+        return queryset
+
+    def get_validator_aggregates(self, queryset):
+        if not self.is_outline():
+            return super().get_validator_aggregates(queryset)
+        return queryset.aggregate(
+            last_modified=Max("updated_at"),
+            count=Count("pk", distinct=True),
+            lessons_last_modified=Max("lessons__updated_at"),
+            lessons_count=Count("lessons"),
+        )
+
+    def get_serializer_class(self):
+        if self.is_outline():
+            return CourseOutlineSerializer
+        return super().get_serializer_class()
+
+    def perform_destroy(self, instance):
+        mark_deleted(instance)
+
+    @action(detail=True, methods=["get"])
+    def outline(self, request, *args, **kwargs):
+        return self.retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=["get"], renderer_classes=StreamingExportMixin.export_renderer_classes)
+    def export(self, request, *args, **kwargs):
+        return super().export(request, *args, **kwargs)
 
 
 class LessonCreateAPIView(CreateAPIView):
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.alive()
+    serializer_class = LessonSerializer
+
+
+class LessonListAPIView(FieldProjectionMixin, SearchMixin, ConditionalReadMixin, CachedReadMixin, FastListMixin,
+                        ListAPIView):
+    queryset = Lesson.objects.alive()
     serializer_class = LessonSerializer
+    cache_models = (Lesson,)
 
 
-class LessonListAPIView(ListAPIView):
-    queryset = Lesson.objects.all()
+class LessonExportAPIView(FieldProjectionMixin, SearchMixin, StreamingExportMixin, GenericAPIView):
+    queryset = Lesson.objects.alive()
     serializer_class = LessonSerializer
+    renderer_classes = StreamingExportMixin.export_renderer_classes
+    export_filename = "lessons"
+
+    def get(self, request, *args, **kwargs):
+        return self.export(request, *args, **kwargs)
 
 
-class LessonRetrieveAPIView(RetrieveAPIView):
-    queryset = Lesson.objects.all()
+class LessonRetrieveAPIView(FieldProjectionMixin, ConditionalReadMixin, CachedReadMixin, RetrieveAPIView):
+    queryset = Lesson.objects.alive()
     serializer_class = LessonSerializer
+    cache_models = (Lesson,)
 
 
 class LessonUpdateAPIView(UpdateAPIView):
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.alive()
     serializer_class = LessonSerializer
 
 
 class LessonDestroyAPIView(DestroyAPIView):
-    queryset = Lesson.objects.all()
+    queryset = Lesson.objects.alive()
     serializer_class = LessonSerializer
+
+
+class CatalogueCacheStatsAPIView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_stats())
+
+
+class LessonBulkAPIView(APIView):
+    """
+    Пакетные операции над уроками: {"create": [...], "update": [{"id": ..., ...}], "delete": [id, ...]}.
+    Всё применяется в одной транзакции через bulk_create, bulk_update и один DELETE ... IN.
+    """
+
+    def post(self, request, *args, **kwargs):
+        payload = LessonBulkSerializer(data=request.data)
+        payload.is_valid(raise_exception=True)
+        create = payload.validated_data["create"]
+        update = payload.validated_data["update"]
+        delete = payload.validated_data["delete"]
+
+        instances = Lesson.objects.alive().in_bulk([item["id"] for item in update])
+        context = {"request": request, "preloaded": preload_courses(create + update)}
+
+        create_serializer = LessonSerializer(data=create, many=True, context=context)
+        update_serializer = LessonSerializer(data=update, many=True, partial=True, context=context)
+        errors = {}
+        if not create_serializer.is_valid():
+            errors["create"] = create_serializer.errors
+        update_errors = [{} for _ in update] if update_serializer.is_valid() else [dict(e) for e in update_serializer.errors]
+        for item, item_errors in zip(update, update_errors):
+            if item["id"] not in instances:
+                item_errors["id"] = ["Урок не найден"]
+        if any(update_errors):
+            errors["update"] = update_errors
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic(), batched_lessons_count(), batched_tombstones():
+            created = Lesson.objects.bulk_create(
+                [Lesson(**attrs) for attrs in create_serializer.validated_data]
+            )
+            # bulk_create и bulk_update не шлют сигналов, счётчики курсов меняем сами.
+            deltas = Counter(lesson.course_id for lesson in created)
+
+            updated = []
+            update_fields = {"updated_at"}
+            now = timezone.now()
+            for item, attrs in zip(update, update_serializer.validated_data):
+                lesson = instances[item["id"]]
+                deltas[lesson.course_id] -= 1
+                for field, value in attrs.items():
+                    setattr(lesson, field, value)
+                lesson.updated_at = now
+                deltas[lesson.course_id] += 1
+                update_fields.update(attrs)
+                updated.append(lesson)
+            if updated:
+                Lesson.objects.bulk_update(updated, fields=sorted(update_fields))
+            change_lessons_count(deltas)
+
+            existing = set(Lesson.objects.alive().filter(pk__in=delete).values_list("pk", flat=True))
+            if existing:
+                Lesson.objects.filter(pk__in=existing).delete()
+
+            transaction.on_commit(lambda: bump_version(Lesson, Course))
+
+        return Response(
+            {
+                "created": LessonSerializer(created, many=True, context=context).data,
+                "updated": LessonSerializer(updated, many=True, context=context).data,
+                "deleted": [{"id": pk, "deleted": pk in existing} for pk in delete],
+            }
+        )
+
+
+class ChangeFeedAPIView(APIView):
+    """
+    Изменения каталога с позиции ?since=<курсор>: изменённые курсы и уроки и
+    id удалённых. Клиент применяет изменения, затем удаления, и повторяет
+    запрос с новым cursor, пока has_more. Без since отдаётся весь каталог;
+    410 означает, что курсор устарел и нужна полная синхронизация.
+    """
+
+    def get(self, request, *args, **kwargs):
+        options = settings.CHANGE_FEED
+        try:
+            limit = min(int(request.query_params.get("limit", options["PAGE_SIZE"])), options["MAX_PAGE_SIZE"])
+        except ValueError:
+            limit = options["PAGE_SIZE"]
+        try:
+            changes = changes_since(request.query_params.get("since"), max(limit, 1))
+        except InvalidCursor:
+            return Response({"since": ["Некорректный курсор"]}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredCursor:
+            return Response(
+                {"detail": "Курсор устарел, загрузите каталог заново без since"}, status=status.HTTP_410_GONE
+            )
+
+        context = {"request": request}
+        changes["courses"] = CourseSerializer(changes["courses"], many=True, context=context).data
+        changes["lessons"] = LessonSerializer(changes["lessons"], many=True, context=context).data
+        return Response(changes)
+
+
+class LessonImportAPIView(APIView):
+    """
+    Импорт уроков из NDJSON или CSV: файл в поле file (multipart) либо тело
+    запроса с Content-Type application/x-ndjson или text/csv. Тело читается
+    построчно, корректные строки сохраняются, ошибки возвращаются с номерами строк.
+    """
+
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        # Импорт (вместе с COPY из courses.seeding) нужен редко и не должен
+        # замедлять старт воркера — модуль загружается при первом вызове.
+        from courses.importing import LessonImporter, guess_format, read_records
+
+        if request.content_type.startswith("multipart/form-data"):
+            upload = request.FILES.get("file")
+            if upload is None:
+                return Response({"file": ["Загрузите файл"]}, status=status.HTTP_400_BAD_REQUEST)
+            lines, file_format = upload, guess_format(upload.name)
+        else:
+            stream = request.stream
+            lines = iter(stream.readline, b"") if stream is not None else ()
+            file_format = "csv" if request.content_type.startswith("text/csv") else "ndjson"
+
+        importer = LessonImporter(context={"request": request})
+        return Response(importer.run(read_records(lines, file_format)))
@@ -0,0 +1,150 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.functional import cached_property
+from rest_framework.authentication import TokenAuthentication
+
+SEQUENCE_KEY = "users:token-cache:sequence"
+EVENT_KEY = "users:token-cache:event:{}"
+# Если процесс отстал больше чем на столько сбросов, он очищается целиком.
+MAX_EVENTS = 1000
+
+
+class TokenCache:
+    """
+    Ограниченный LRU-кэш token -> (user, token) с TTL.
+
+    Для согласованности между процессами каждый сброс публикуется в общем
+    кэше как событие с номером ("token", key) или ("user", id). Остальные
+    процессы не чаще раза в sync_interval секунд читают новые события и
+    удаляют только затронутые записи; целиком кэш очищается, лишь если
+    события потеряны. Кэш cache_alias должен быть общим для воркеров:
+    с LocMemCache/DummyCache сбросы до соседей не дойдут (выход или удаление
+    токена в одном воркере не отзовёт его в других до ttl), поэтому кэш
+    токенов тогда отключается и каждый запрос проверяет токен в БД.
+    """
+
+    def __init__(self, maxsize, ttl, sync_interval, cache_alias):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.sync_interval = sync_interval
+        self.cache_alias = cache_alias
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._sequence = None
+        self._synced_at = 0.0
+
+    @cached_property
+    def enabled(self):
+        return self.maxsize > 0 and not isinstance(caches[self.cache_alias], (LocMemCache, DummyCache))
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        self._sync()
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def evict(self, key):
+        if self.enabled:
+            self._drop_token(key)
+            self._publish(("token", key))
+
+    def evict_user(self, user_id):
+        if self.enabled:
+            self._drop_user(user_id)
+            self._publish(("user", user_id))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def _drop_token(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def _drop_user(self, user_id):
+        with self._lock:
+            for key in [key for key, (_, (user, _)) in self._data.items() if user.pk == user_id]:
+                del self._data[key]
+
+    def _publish(self, event):
+        shared = caches[self.cache_alias]
+        try:
+            sequence = shared.incr(SEQUENCE_KEY)
+        except ValueError:
+            shared.add(SEQUENCE_KEY, 0, timeout=None)
+            sequence = shared.incr(SEQUENCE_KEY)
+        # Запись, закэшированная до события, живёт не дольше ttl — событию хватает того же срока.
+        shared.set(EVENT_KEY.format(sequence), event, timeout=self.ttl)
+
+    def _sync(self):
+        now = time.monotonic()
+        if now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+        shared = caches[self.cache_alias]
+        # Ключа ещё нет — сбросов не было; после перезапуска общего кэша номер меньше нашего.
+        sequence = shared.get(SEQUENCE_KEY, 0)
+        if sequence == self._sequence:
+            return
+        if self._sequence is None or not 0 < sequence - self._sequence <= MAX_EVENTS:
+            # Первая сверка, перезапуск общего кэша или слишком большое отставание.
+            self.clear()
+            self._sequence = sequence
+            return
+        numbers = range(self._sequence + 1, sequence + 1)
+        events = shared.get_many([EVENT_KEY.format(number) for number in numbers])
+        if len(events) < len(numbers):
+            # Событие вытеснено или ещё не записано (номер уже выдан).
+            self.clear()
+        else:
+            for kind, value in events.values():
+                if kind == "token":
+                    self._drop_token(value)
+                else:
+                    self._drop_user(value)
+        self._sequence = sequence
+
+
+token_cache = TokenCache(
+    maxsize=settings.TOKEN_AUTH_CACHE["MAXSIZE"],
+    ttl=settings.TOKEN_AUTH_CACHE["TTL"],
+    sync_interval=settings.TOKEN_AUTH_CACHE["SYNC_INTERVAL"],
+    cache_alias=settings.TOKEN_AUTH_CACHE["CACHE_ALIAS"],
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            cached = super().authenticate_credentials(key)
+            token_cache.set(key, cached)
+        user, token = cached
+        # Копия, чтобы изменения request.user в одном запросе не были видны другим.
+        return copy.copy(user), token
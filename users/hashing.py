@@ -0,0 +1,77 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class HashingPool:
+    """
+    Пул для CPU-ёмкого хеширования паролей (PBKDF2) вне event loop.
+
+    hashlib.pbkdf2_hmac отпускает GIL, поэтому потоков достаточно:
+    max_workers ограничивает число одновременных хеширований, а
+    queued/active показывают глубину очереди.
+    """
+
+    def __init__(self, max_workers, max_queue):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.active = 0
+
+    @property
+    def executor(self):
+        # Создаём лениво, чтобы потоки не появлялись в процессе до fork().
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="password-hashing"
+                    )
+        return self._executor
+
+    def is_saturated(self):
+        return bool(self.max_queue) and self.queued >= self.max_queue
+
+    async def run(self, func, *args):
+        with self._lock:
+            self.queued += 1
+        future = self.executor.submit(self._call, func, args)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Задача, которую поток ещё не взял, снимается с очереди здесь:
+            # _call для неё не выполнится и счётчик не уменьшит.
+            if future.cancel():
+                with self._lock:
+                    self.queued -= 1
+            raise
+
+    def _call(self, func, args):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+            close_old_connections()
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queued": self.queued,
+            "active": self.active,
+        }
+
+
+hashing_pool = HashingPool(
+    max_workers=settings.PASSWORD_HASHING["MAX_WORKERS"],
+    max_queue=settings.PASSWORD_HASHING["MAX_QUEUE"],
+)
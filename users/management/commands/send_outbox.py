@@ -0,0 +1,42 @@
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from users.outbox import drain, stats
+
+
+class Command(BaseCommand):
+    help = "Отправляет письма из очереди OutboundEmail пачками через одно SMTP-соединение"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, help="Писем в пачке (по умолчанию OUTBOX['BATCH_SIZE'])")
+        parser.add_argument("--loop", action="store_true", help="Не завершаться, ждать новые письма")
+        parser.add_argument("--interval", type=float, default=1.0, help="Пауза между опросами пустой очереди")
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        started = time.perf_counter()
+        connection = get_connection()
+        try:
+            while True:
+                sent, failed = drain(connection=connection, batch_size=options["batch_size"])
+                total_sent += sent
+                total_failed += failed
+                if sent or failed:
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            connection.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Отправлено {total_sent}, с ошибкой {total_failed} за {elapsed:.2f} с "
+                f"({round(total_sent / elapsed) if elapsed else 0} писем/с); очередь: {stats()}"
+            )
+        )
@@ -0,0 +1,76 @@
+import datetime
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from users.models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(to, subject, body):
+    """Ставит письмо в очередь: из обработчика запроса — только один INSERT."""
+    return OutboundEmail.objects.create(to=to, subject=subject, body=body)
+
+
+def drain(connection=None, batch_size=None, max_attempts=None, backoff_seconds=None):
+    """
+    Отправляет одну пачку готовых к отправке писем через одно SMTP-соединение.
+    Строки блокируются SELECT ... FOR UPDATE SKIP LOCKED, поэтому несколько
+    воркеров не отправят одно письмо дважды. Неудачные письма откладываются
+    с удваивающейся задержкой, после max_attempts попыток помечаются failed.
+    Возвращает (отправлено, с ошибкой).
+    """
+    config = settings.OUTBOX
+    batch_size = batch_size or config["BATCH_SIZE"]
+    max_attempts = max_attempts or config["MAX_ATTEMPTS"]
+    backoff_seconds = backoff_seconds or config["BACKOFF_SECONDS"]
+    connection = connection or get_connection()
+
+    with transaction.atomic():
+        now = timezone.now()
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.PENDING, next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if not emails:
+            return 0, 0
+
+        sent = failed = 0
+        for email in emails:
+            message = EmailMessage(email.subject, email.body, to=[email.to], connection=connection)
+            try:
+                # Открывает соединение только если оно ещё не открыто.
+                connection.open()
+                connection.send_messages([message])
+            except Exception as exc:
+                logger.warning("Не удалось отправить письмо %s на %s: %s", email.pk, email.to, exc)
+                # Соединение могло оборваться: следующее письмо откроет новое.
+                connection.close()
+                email.attempts += 1
+                email.last_error = str(exc)
+                if email.attempts >= max_attempts:
+                    email.status = OutboundEmail.FAILED
+                else:
+                    delay = backoff_seconds * 2 ** (email.attempts - 1)
+                    email.next_attempt_at = timezone.now() + datetime.timedelta(seconds=delay)
+                failed += 1
+            else:
+                email.status = OutboundEmail.SENT
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                sent += 1
+
+        OutboundEmail.objects.bulk_update(
+            emails, ["status", "attempts", "next_attempt_at", "last_error", "sent_at"]
+        )
+    return sent, failed
+
+
+def stats():
+    return dict(OutboundEmail.objects.values_list("status").annotate(Count("id")).order_by())
@@ -1,10 +1,14 @@
 from django.contrib.auth import authenticate
 from rest_framework import serializers
 
+from config.instrumentation import TimedSerializerMixin
+from config.thumbnails import ThumbnailsField
 from users.models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    avatar_thumbnails = ThumbnailsField(source="avatar", sizes_key="AVATAR_SIZES")
+
     class Meta:
         model = User
         fields = (
@@ -15,6 +19,7 @@ class UserSerializer(serializers.ModelSerializer):
             "phone_number",
             "city",
             "avatar",
+            "avatar_thumbnails",
         )
         read_only_fields = ("id", "email")
 
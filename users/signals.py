@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from config.thumbnails import register_thumbnails
+from users.authentication import token_cache
+from users.models import User
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    token_cache.evict(instance.key)
+
+
+@receiver(post_save, sender=User)
+def evict_saved_user_tokens(sender, instance, created, update_fields=None, **kwargs):
+    # У нового пользователя закэшированных токенов нет; last_login обновляется
+    # при каждом входе и на аутентификацию не влияет.
+    if created or update_fields == frozenset({"last_login"}):
+        return
+    token_cache.evict_user(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def evict_deleted_user_tokens(sender, instance, **kwargs):
+    token_cache.evict_user(instance.pk)
+
+
+register_thumbnails(User, "avatar", sizes_key="AVATAR_SIZES")
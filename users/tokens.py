@@ -0,0 +1,33 @@
+from asgiref.sync import sync_to_async
+from django.db import connection
+from rest_framework.authtoken.models import Token
+
+
+def get_or_create_token(user):
+    """
+    Возвращает ключ токена пользователя. На PostgreSQL это один запрос:
+    INSERT ... ON CONFLICT DO NOTHING RETURNING и SELECT существующего ключа
+    в одном CTE, без SELECT + INSERT и без пустого UPDATE строки токена.
+    """
+    if connection.vendor != "postgresql":
+        token, _ = Token.objects.get_or_create(user=user)
+        return token.key
+
+    table = connection.ops.quote_name(Token._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH inserted AS (INSERT INTO {table} ("key", user_id, created) VALUES (%s, %s, NOW()) '
+            'ON CONFLICT (user_id) DO NOTHING RETURNING "key") '
+            f'SELECT "key" FROM inserted UNION ALL SELECT "key" FROM {table} WHERE user_id = %s LIMIT 1',
+            [Token.generate_key(), user.pk, user.pk],
+        )
+        row = cursor.fetchone()
+        if row is None:
+            # Токен вставила параллельная транзакция после снимка этого запроса:
+            # новый запрос его уже видит.
+            cursor.execute(f'SELECT "key" FROM {table} WHERE user_id = %s', [user.pk])
+            row = cursor.fetchone()
+        return row[0]
+
+
+aget_or_create_token = sync_to_async(get_or_create_token)
@@ -1,18 +1,26 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework.routers import SimpleRouter
 
 from users.apps import UsersConfig
-from users.views import UserProfileViewSet, UserRegistrationAPIView, LoginAPIView, LogoutAPIView
+from users.views import UserProfileViewSet, UserRegistrationAPIView, LoginAPIView, LogoutAPIView, \
+	UserRegistrationAsyncView, LoginAsyncView, PasswordHashingStatsAPIView
 
 app_name = UsersConfig.name
 
 router = SimpleRouter()
 router.register("profile", UserProfileViewSet, basename="profile")
 
+if settings.ASYNC_AUTH_VIEWS:
+	register_view, login_view = UserRegistrationAsyncView, LoginAsyncView
+else:
+	register_view, login_view = UserRegistrationAPIView, LoginAPIView
+
 urlpatterns = [
-	path("register/", UserRegistrationAPIView.as_view(), name="register"),
-	path("login/", LoginAPIView.as_view(), name="login"),
+	path("register/", register_view.as_view(), name="register"),
+	path("login/", login_view.as_view(), name="login"),
 	path("logout/", LogoutAPIView.as_view(), name="logout"),
+	path("hashing/stats/", PasswordHashingStatsAPIView.as_view(), name="hashing_stats"),
 ]
 
 urlpatterns += router.urls
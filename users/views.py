@@ -1,12 +1,27 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.mixins import RetrieveModelMixin, UpdateModelMixin
 
+from courses import json_backend
+from courses.renderers import FastJSONRenderer
+from users.hashing import hashing_pool
 from users.models import User
+from users.outbox import enqueue
 from users.serializers import UserSerializer, UserRegistrationSerializer, LoginSerializer
+from users.tokens import aget_or_create_token, get_or_create_token
+
+
+def send_welcome_email(user):
+	enqueue(user.email, "Добро пожаловать", f"Вы зарегистрированы с почтой {user.email}.")
 
 
 class UserProfileViewSet(RetrieveModelMixin, UpdateModelMixin, GenericViewSet):
@@ -19,8 +34,8 @@ class UserRegistrationAPIView(APIView):
 		serializer = UserRegistrationSerializer(data=request.data)
 		serializer.is_valid(raise_exception=True)
 		user = serializer.save()
-		token, _ = Token.objects.get_or_create(user=user)
-		return Response({"token": token.key}, status=status.HTTP_201_CREATED)
+		send_welcome_email(user)
+		return Response({"token": get_or_create_token(user)}, status=status.HTTP_201_CREATED)
 
 
 class LoginAPIView(APIView):
@@ -28,8 +43,7 @@ class LoginAPIView(APIView):
 		serializer = LoginSerializer(data=request.data, context={"request": request})
 		serializer.is_valid(raise_exception=True)
 		user = serializer.validated_data["user"]
-		token, _ = Token.objects.get_or_create(user=user)
-		return Response({"token": token.key})
+		return Response({"token": get_or_create_token(user)})
 
 
 class LogoutAPIView(APIView):
@@ -38,3 +52,64 @@ class LogoutAPIView(APIView):
 		if token:
 			token.delete()
 		return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class PasswordHashingStatsAPIView(APIView):
+	permission_classes = [IsAdminUser]
+
+	def get(self, request, *args, **kwargs):
+		return Response(hashing_pool.stats())
+
+
+def json_response(data, status=status.HTTP_200_OK, headers=None):
+	return HttpResponse(
+		FastJSONRenderer().render(data), status=status, headers=headers, content_type="application/json"
+	)
+
+
+def parse_request_data(request):
+	if request.content_type == "application/json":
+		return json_backend.loads(request.body or b"{}")
+	data = request.POST.copy()
+	data.update(request.FILES)
+	return data
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncAuthView(View):
+	"""
+	Базовый async-view для ASGI: хеширование пароля выполняется в
+	hashing_pool, поэтому event loop не блокируется во время PBKDF2.
+	"""
+
+	async def post(self, request, *args, **kwargs):
+		if hashing_pool.is_saturated():
+			return json_response(
+				{"detail": "Сервис перегружен, повторите попытку позже"},
+				status=status.HTTP_503_SERVICE_UNAVAILABLE,
+				headers={"Retry-After": "1"},
+			)
+		try:
+			data = parse_request_data(request)
+		except ValueError as exc:
+			return json_response({"detail": f"JSON parse error - {exc}"}, status=status.HTTP_400_BAD_REQUEST)
+		return await self.handle(request, data)
+
+
+class UserRegistrationAsyncView(AsyncAuthView):
+	async def handle(self, request, data):
+		serializer = UserRegistrationSerializer(data=data)
+		if not await sync_to_async(serializer.is_valid)():
+			return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+		user = await hashing_pool.run(serializer.save)
+		await sync_to_async(send_welcome_email)(user)
+		return json_response({"token": await aget_or_create_token(user)}, status=status.HTTP_201_CREATED)
+
+
+class LoginAsyncView(AsyncAuthView):
+	async def handle(self, request, data):
+		serializer = LoginSerializer(data=data, context={"request": request})
+		if not await hashing_pool.run(serializer.is_valid):
+			return json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+		user = serializer.validated_data["user"]
+		return json_response({"token": await aget_or_create_token(user)})